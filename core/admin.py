@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, Story, Episode, Comment, Profile
+from .models import Category, Story, Episode, Comment, Profile, Task
 
 
 @admin.register(Category)
@@ -61,3 +61,11 @@ class CommentAdmin(admin.ModelAdmin):
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "bio")
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "run_at", "finished_at")
+    list_filter = ("status", "name")
+    ordering = ("-created_at",)
+    readonly_fields = ("created_at", "locked_at", "finished_at", "last_error")
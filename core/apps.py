@@ -5,4 +5,6 @@ class CoreConfig(AppConfig):
     name = 'core'
 
     def ready(self):
+        import core.db
         import core.signals
+        import core.tasks
@@ -0,0 +1,223 @@
+import sys
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+from .cache import bump_version, get_version
+from .routers import primary_reads
+
+
+# ===========================
+#      AUTOCOMPLETADO
+# ===========================
+# Índice en memoria (por proceso) de títulos de historias y nombres de
+# usuario: una lista ordenada de claves normalizadas en la que se busca
+# por prefijo con bisect. Cada palabra del título es también un punto de
+# entrada, así "drag" encuentra "El Dragón de fuego".
+#
+# Se construye en la primera consulta. Después no se reconstruye por cada
+# cambio: las señales apuntan el cambio en el caché compartido con un
+# número de versión (autocomplete:change:<n>) y cada proceso, antes de
+# buscar, aplica a su índice los cambios que le faltan. Solo se reconstruye
+# entero si falta algún cambio en el registro (caducado, o una importación
+# masiva que llama a invalidate()), si hay demasiados pendientes o cada
+# AUTOCOMPLETE_MAX_AGE segundos; y lo hace un solo hilo mientras los demás
+# siguen usando el índice anterior.
+
+VERSION_NAME = "autocomplete"
+DEFAULT_LIMIT = 8
+
+CHANGE_TIMEOUT = 60 * 60
+REBUILD = "rebuild"
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def _keys(label):
+    words = normalize(label).split()
+    return {" ".join(words[i:]) for i in range(len(words))}
+
+
+class PrefixIndex:
+    def __init__(self):
+        self.entries = []       # [(clave, tipo, id)] ordenada
+        self.items = {}         # (tipo, id) → (etiqueta, slug/username)
+        self.lock = threading.RLock()
+        self.build_lock = threading.Lock()
+        self.built = False
+        self.version = None
+        self.built_at = 0.0
+        self.build_ms = 0.0
+
+    # ---------------------------
+    #   Construcción
+    # ---------------------------
+    def build(self):
+        from .models import Story
+
+        start = time.perf_counter()
+        version = get_version(VERSION_NAME)
+        entries = []
+        items = {}
+
+        with primary_reads():
+            for story_id, title, slug in Story.published.values_list("id", "title", "slug").iterator(chunk_size=2000):
+                items[("story", story_id)] = (title, slug)
+                entries.extend((key, "story", story_id) for key in _keys(title))
+
+            for user_id, username in User.objects.values_list("id", "username").iterator(chunk_size=2000):
+                items[("user", user_id)] = (username, username)
+                entries.extend((key, "user", user_id) for key in _keys(username))
+
+        entries.sort()
+
+        with self.lock:
+            self.entries = entries
+            self.items = items
+            self.built = True
+            self.version = version
+            self.built_at = time.time()
+            self.build_ms = (time.perf_counter() - start) * 1000
+
+    def ensure_built(self):
+        if not self.built:
+            # Sin índice no hay nada que servir: se espera al que lo construye
+            with self.build_lock:
+                if not self.built:
+                    self.build()
+            return
+
+        max_age = getattr(settings, "AUTOCOMPLETE_MAX_AGE", 300)
+        if time.time() - self.built_at > max_age or not self.catch_up():
+            # Un solo hilo reconstruye; los demás siguen con el índice actual
+            if self.build_lock.acquire(blocking=False):
+                try:
+                    self.build()
+                finally:
+                    self.build_lock.release()
+
+    def catch_up(self):
+        """
+        Aplica los cambios del registro posteriores a la versión del índice.
+        Devuelve False si hace falta reconstruirlo entero.
+        """
+        current = get_version(VERSION_NAME)
+        if self.version == current:
+            return True
+
+        max_changes = getattr(settings, "AUTOCOMPLETE_MAX_CHANGES", 500)
+        if current < self.version or current - self.version > max_changes:
+            return False
+
+        versions = range(self.version + 1, current + 1)
+        changes = cache.get_many([change_key(version) for version in versions])
+
+        with self.lock:
+            for version in versions:
+                change = changes.get(change_key(version))
+                if change == REBUILD:
+                    return False
+                if change is None:
+                    # Recién numerado y aún sin escribir, o caducado (en ese
+                    # caso la reconstrucción por antigüedad lo resuelve)
+                    break
+                kind, obj_id, label, target = change
+                if label is None:
+                    self.remove(kind, obj_id)
+                else:
+                    self.update(kind, obj_id, label, target)
+                self.version = version
+        return True
+
+    # ---------------------------
+    #   Actualización incremental
+    # ---------------------------
+    def update(self, kind, obj_id, label, target):
+        with self.lock:
+            self._remove(kind, obj_id)
+            self.items[(kind, obj_id)] = (label, target)
+            for key in _keys(label):
+                insort(self.entries, (key, kind, obj_id))
+
+    def remove(self, kind, obj_id):
+        with self.lock:
+            self._remove(kind, obj_id)
+
+    def _remove(self, kind, obj_id):
+        old = self.items.pop((kind, obj_id), None)
+        if old is None:
+            return
+        for key in _keys(old[0]):
+            i = bisect_left(self.entries, (key, kind, obj_id))
+            if i < len(self.entries) and self.entries[i] == (key, kind, obj_id):
+                del self.entries[i]
+
+    # ---------------------------
+    #   Consulta
+    # ---------------------------
+    def search(self, prefix, limit=DEFAULT_LIMIT):
+        prefix = normalize(prefix).strip()
+        if not prefix:
+            return []
+
+        results = []
+        seen = set()
+
+        with self.lock:
+            i = bisect_left(self.entries, (prefix,))
+            while i < len(self.entries) and len(results) < limit:
+                key, kind, obj_id = self.entries[i]
+                if not key.startswith(prefix):
+                    break
+                if (kind, obj_id) not in seen:
+                    seen.add((kind, obj_id))
+                    label, target = self.items[(kind, obj_id)]
+                    results.append({"type": kind, "id": obj_id, "label": label, "target": target})
+                i += 1
+
+        return results
+
+    def stats(self):
+        with self.lock:
+            memory = sys.getsizeof(self.entries) + sys.getsizeof(self.items)
+            memory += sum(sys.getsizeof(entry) + sys.getsizeof(entry[0]) for entry in self.entries)
+            memory += sum(
+                sys.getsizeof(value) + sys.getsizeof(value[0]) + sys.getsizeof(value[1])
+                for value in self.items.values()
+            )
+            return {
+                "built": self.built,
+                "entries": len(self.entries),
+                "items": len(self.items),
+                "memory_bytes": memory,
+                "build_ms": round(self.build_ms, 2),
+                "age_s": round(time.time() - self.built_at, 1) if self.built else None,
+            }
+
+
+prefix_index = PrefixIndex()
+
+
+def change_key(version):
+    return f"{VERSION_NAME}:change:{version}"
+
+
+def changed(kind, obj_id, label=None, target=None):
+    """
+    Apunta un cambio (label=None: quitar) en el registro compartido; cada
+    proceso lo aplica a su índice en su próxima consulta.
+    """
+    cache.set(change_key(bump_version(VERSION_NAME)), (kind, obj_id, label, target), CHANGE_TIMEOUT)
+
+
+def invalidate():
+    """Fuerza la reconstrucción en todos los procesos (cambios masivos)."""
+    cache.set(change_key(bump_version(VERSION_NAME)), REBUILD, CHANGE_TIMEOUT)
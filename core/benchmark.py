@@ -0,0 +1,245 @@
+import platform
+import subprocess
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+import django
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from .models import Comment, Episode, Story
+from .reading_progress import progress_buffer
+from .synthetic import generate, test_database
+from .view_counter import view_counter
+
+
+# ===========================
+#      BENCHMARK DE VISTAS
+# ===========================
+# Recorre todas las rutas de la aplicación con el cliente de pruebas de
+# Django sobre una base de datos de prueba con datos sintéticos, a varias
+# escalas, y mide latencia (p50/p95/p99) y consultas SQL por vista.
+# El resultado es un JSON para comparar entre commits.
+
+# Rutas que no se pueden repetir sin romper la medición
+SKIPPED = {
+    "logout": "cierra la sesión del cliente",
+    "delete_story": "destructiva",
+    "delete_episode": "destructiva",
+    "delete_comment": "destructiva",
+}
+
+# Caché propio del benchmark: measure() lo vacía antes de cada ruta y no
+# debe tocar el caché real (Redis o la tabla compartidos con producción)
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "benchmark",
+    }
+}
+
+# Rutas que solo aceptan POST, con sus datos
+POST_DATA = {
+    "reading_progress": {"percent": "50"},
+}
+
+# Alternan estado en cada petición (se miden en pares: el estado final no cambia)
+TOGGLES = {"toggle_favorite", "toggle_follow"}
+
+
+def _iter_patterns(resolver=None, prefix=""):
+    resolver = resolver or get_resolver()
+    for entry in resolver.url_patterns:
+        if isinstance(entry, URLResolver):
+            yield from _iter_patterns(entry, prefix + str(entry.pattern))
+        elif isinstance(entry, URLPattern) and entry.name:
+            yield entry
+
+
+def app_routes():
+    """(nombre, parámetros) de las rutas de la aplicación, sin el admin."""
+    routes = {}
+    for pattern in _iter_patterns():
+        module = getattr(pattern.callback, "__module__", "")
+        if module.startswith("core.") and pattern.name not in routes:
+            routes[pattern.name] = list(getattr(pattern.pattern, "converters", {}))
+    return routes
+
+
+def _sample(prefix):
+    """Objetos concretos para rellenar los parámetros de las URLs."""
+    story = (
+        Story.published.filter(slug__startswith=prefix, episodes__isnull=False)
+        .select_related("author", "category")
+        .order_by("-favorites_count", "id")
+        .first()
+    )
+    author = story.author
+    author.is_staff = True  # /metricas/
+    author.save(update_fields=["is_staff"])
+
+    episode = Episode.objects.filter(story=story).order_by("number").first()
+    comment = Comment.objects.create(episode=episode, user=author, text="Comentario del benchmark")
+    other = (
+        Story.published.filter(slug__startswith=prefix).exclude(author=author)
+        .select_related("author").first()
+    )
+    other_user = other.author if other else author
+
+    return author, {
+        "story_slug": story.slug,
+        "slug": story.slug,
+        "number": episode.number,
+        "category_slug": story.category.slug,
+        "episode_id": episode.id,
+        "comment_id": comment.id,
+        "story_id": story.id,
+        "username": other_user.username,
+        "uidb64": urlsafe_base64_encode(force_bytes(author.pk)),
+        "token": default_token_generator.make_token(author),
+    }
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(client, name, url, requests):
+    """Lanza `requests` peticiones y resume latencias y consultas."""
+    method = "post" if name in POST_DATA else "get"
+    data = POST_DATA.get(name)
+    headers = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"} if name in TOGGLES else {}
+    if name in TOGGLES and requests % 2:
+        requests += 1
+
+    # Cada ruta empieza con el caché vacío: la primera petición es "en frío"
+    cache.clear()
+
+    latencies, queries, statuses = [], [], Counter()
+    for _ in range(requests):
+        # Todas las conexiones: con réplica, las lecturas no van a "default"
+        with ExitStack() as stack:
+            captured = [stack.enter_context(CaptureQueriesContext(connections[alias])) for alias in connections]
+            start = time.perf_counter()
+            response = getattr(client, method)(url, data, **headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(sum(len(context) for context in captured))
+        statuses[response.status_code] += 1
+
+    return {
+        "url": url,
+        "method": method.upper(),
+        "requests": requests,
+        "status": dict(statuses),
+        "cold_ms": round(latencies[0], 2),
+        "cold_queries": queries[0],
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2),
+        "avg_queries": round(sum(queries) / len(queries), 2),
+        "max_queries": max(queries),
+    }
+
+
+def run_scale(scale, requests, seed=42, prefix="bench", stdout=None):
+    """Genera los datos de una escala y mide todas las rutas (anónimo y con sesión)."""
+    start = time.monotonic()
+    rows = generate(scale=scale, seed=seed, prefix=prefix)
+    generated_s = time.monotonic() - start
+
+    author, sample = _sample(prefix)
+    # Un error en una vista se anota (status 500) en lugar de cortar la medición
+    anonymous = Client(raise_request_exception=False)
+    logged_in = Client(raise_request_exception=False)
+    logged_in.force_login(author)
+
+    results, skipped = {}, {}
+    for name, params in sorted(app_routes().items()):
+        if name in SKIPPED:
+            skipped[name] = SKIPPED[name]
+            continue
+        url = reverse(name, kwargs={param: sample[param] for param in params})
+
+        for mode, client in (("anon", anonymous), ("auth", logged_in)):
+            result = measure(client, name, url, requests)
+            # Rutas con login: en anónimo solo redirigen, no aportan nada
+            if mode == "anon" and set(result["status"]) <= {301, 302}:
+                continue
+            results[f"{name} [{mode}]"] = result
+            if stdout is not None:
+                stdout.write(
+                    f"  {name:<22} {mode:<4} p50 {result['p50_ms']:>8.2f} ms  "
+                    f"p95 {result['p95_ms']:>8.2f} ms  consultas {result['avg_queries']:>5}"
+                )
+
+    # Lo que quede en los buffers se escribe en esta base, no en la real
+    view_counter.flush_safely()
+    progress_buffer.flush_safely()
+
+    return {
+        "scale": scale,
+        "rows": rows,
+        "generate_s": round(generated_s, 2),
+        "routes": results,
+        "skipped": skipped,
+    }
+
+
+def run(scales, requests, seed=42, stdout=None):
+    """Ejecuta el benchmark en una base de datos de prueba nueva por escala."""
+    results = []
+    for scale in scales:
+        if stdout is not None:
+            stdout.write(f"Escala {scale}:")
+        with test_database(), override_settings(CACHES=BENCHMARK_CACHES):
+            results.append(run_scale(scale, requests, seed=seed, stdout=stdout))
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "requests_per_route": requests,
+        },
+        "scales": results,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old, new):
+    """Filas (escala, ruta, p50 antes/después, consultas antes/después) comunes a ambos."""
+    rows = []
+    old_scales = {entry["scale"]: entry["routes"] for entry in old["scales"]}
+    for entry in new["scales"]:
+        before = old_scales.get(entry["scale"], {})
+        for route, result in entry["routes"].items():
+            if route in before:
+                rows.append((
+                    entry["scale"], route,
+                    before[route]["p50_ms"], result["p50_ms"],
+                    before[route]["avg_queries"], result["avg_queries"],
+                ))
+    return rows
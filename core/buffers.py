@@ -0,0 +1,90 @@
+import atexit
+import logging
+import threading
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+# ===========================
+#      BUFFERS CON VOLCADO PERIÓDICO
+# ===========================
+# Base para acumular escrituras en memoria (por proceso) y volcarlas en
+# lote: cada FLUSH_INTERVAL segundos con un temporizador, cuando hay
+# FLUSH_SIZE claves pendientes, o al terminar el proceso.
+
+
+class TimedBuffer(ABC):
+    # Nombres de los settings y sus valores por defecto
+    interval_setting = None
+    size_setting = None
+    default_interval = 30
+    default_size = 1000
+
+    def __init__(self):
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.timer = None
+        atexit.register(self.flush_safely)
+
+    def merge(self, pending, key, value):
+        """Combina `value` con lo pendiente para `key` (por defecto: el último gana)."""
+        pending[key] = value
+
+    @abstractmethod
+    def write(self, pending):
+        """Persiste el lote. Las subclases lo implementan."""
+
+    def put(self, key, value):
+        with self.lock:
+            self.merge(self.pending, key, value)
+            size = len(self.pending)
+            self._schedule()
+
+        if size >= getattr(settings, self.size_setting, self.default_size):
+            self.flush()
+
+    def _schedule(self):
+        # Se llama con el lock tomado
+        if self.timer is None:
+            self.timer = threading.Timer(
+                getattr(settings, self.interval_setting, self.default_interval), self._on_timer
+            )
+            self.timer.daemon = True
+            self.timer.start()
+
+    def _on_timer(self):
+        with self.lock:
+            self.timer = None
+        self.flush_safely()
+
+    def flush_safely(self):
+        try:
+            return self.flush()
+        except Exception:
+            logger.exception("No se pudo volcar %s", type(self).__name__)
+            return 0
+
+    def flush(self):
+        """Vuelca lo pendiente. Devuelve el número de claves escritas."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+
+        if not pending:
+            return 0
+
+        try:
+            self.write(pending)
+        except Exception:
+            # No se pierde nada: vuelve al buffer para el siguiente intento
+            # (lo que haya llegado mientras tanto se combina encima)
+            with self.lock:
+                newer, self.pending = self.pending, pending
+                for key, value in newer.items():
+                    self.merge(self.pending, key, value)
+            raise
+
+        return len(pending)
@@ -0,0 +1,301 @@
+import gzip
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils.text import slugify
+
+from . import autocomplete, search, story_stats
+from .cache import bump_version
+from .models import Category, Episode, Story
+from .page_cache import LISTS_SCOPE
+
+
+# ===========================
+#      IMPORTAR / EXPORTAR HISTORIAS
+# ===========================
+# Formato JSON Lines (un objeto por línea, .jsonl o .jsonl.gz). Cada
+# historia va seguida de sus episodios:
+#
+#   {"type": "story", "slug": "...", "title": "...", "description": "...",
+#    "author": "usuario", "category": "slug-categoria", "status": "published"}
+#   {"type": "episode", "story": "slug", "number": 1, "title": "...", "content": "..."}
+#
+# Todo se procesa en streaming con generadores: exportar usa iterator()
+# y escribir/leer no guarda más que un lote en memoria.
+
+EXPORT_CHUNK_SIZE = 500
+IMPORT_BATCH_SIZE = 500
+AUTHOR_CHUNK_SIZE = 500
+
+
+class BundleError(ValueError):
+    pass
+
+
+def open_bundle(path, mode):
+    """Abre el fichero (comprimido si termina en .gz) en modo texto."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return io.open(path, mode, encoding="utf-8")
+
+
+# ---------------------------
+#   Exportar
+# ---------------------------
+def export_records(stories=None):
+    """
+    Genera los registros de las historias y sus episodios. Dos consultas
+    con cursor (historias por id y episodios por (historia, número)) que se
+    recorren a la vez: memoria constante aunque el catálogo sea enorme.
+    """
+    stories = (stories if stories is not None else Story.objects.all())
+    story_rows = (
+        stories.order_by("id")
+        .values_list("id", "slug", "title", "description", "author__username", "category__slug", "status")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    episode_rows = (
+        Episode.objects.filter(story__in=stories.values("id"))
+        .order_by("story_id", "number")
+        .values_list("story_id", "number", "title", "content")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    pending = next(episode_rows, None)
+    for story_id, slug, title, description, author, category, status in story_rows:
+        yield {
+            "type": "story",
+            "slug": slug,
+            "title": title,
+            "description": description,
+            "author": author,
+            "category": category,
+            "status": status,
+        }
+        while pending is not None and pending[0] == story_id:
+            _, number, ep_title, content = pending
+            yield {"type": "episode", "story": slug, "number": number, "title": ep_title, "content": content}
+            pending = next(episode_rows, None)
+
+
+def write_records(records, fp):
+    """Escribe los registros como JSON Lines. Devuelve (registros, bytes)."""
+    count = size = 0
+    for record in records:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        fp.write(line)
+        count += 1
+        size += len(line.encode("utf-8"))
+    return count, size
+
+
+# ---------------------------
+#   Importar
+# ---------------------------
+def read_records(fp):
+    """
+    Lee y valida los registros. Los errores se detectan aquí, con su número
+    de línea, y no al guardar: un IntegrityError a mitad de la importación
+    dejaría los lotes anteriores ya guardados.
+    """
+    statuses = dict(Story.STATUS_CHOICES)
+    episode_numbers = {}    # slug de historia → números vistos
+    for line_number, line in enumerate(fp, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise BundleError(f"Línea {line_number}: JSON no válido ({exc.msg})")
+        if not isinstance(record, dict) or record.get("type") not in ("story", "episode"):
+            raise BundleError(f"Línea {line_number}: tipo de registro desconocido")
+        if not isinstance(record.get("title"), str) or not record["title"].strip():
+            raise BundleError(f"Línea {line_number}: falta el título")
+
+        if record["type"] == "story":
+            status = record.get("status", "draft")
+            if status not in statuses:
+                raise BundleError(f"Línea {line_number}: estado '{status}' no válido")
+            # Mismo slug que usará el Importer
+            episode_numbers.setdefault(record.get("slug") or slugify(record["title"]), set())
+
+        else:
+            slug = record.get("story")
+            if slug not in episode_numbers:
+                raise BundleError(f"Línea {line_number}: el episodio no sigue a su historia '{slug}'")
+            number = record.get("number")
+            # bool es subclase de int: true/false no son números de episodio
+            if not isinstance(number, int) or isinstance(number, bool) or number < 1:
+                raise BundleError(f"Línea {line_number}: número de episodio no válido ({number!r})")
+            if number in episode_numbers[slug]:
+                raise BundleError(f"Línea {line_number}: episodio {number} repetido en la historia '{slug}'")
+            episode_numbers[slug].add(number)
+
+        record["_line"] = line_number
+        yield record
+
+
+def check_bundle(records, author=None):
+    """
+    Recorre el fichero entero sin guardar nada (read_records valida cada
+    línea) y comprueba que existen los autores, en una consulta por bloque
+    de nombres. Devuelve {usuario: id} para el Importer.
+    """
+    first_line = {}
+    for record in records:
+        if record["type"] == "story" and author is None:
+            first_line.setdefault(record.get("author"), record["_line"])
+
+    names = [name for name in first_line if isinstance(name, str)]
+    authors = {}
+    for start in range(0, len(names), AUTHOR_CHUNK_SIZE):
+        authors.update(
+            User.objects.filter(username__in=names[start:start + AUTHOR_CHUNK_SIZE])
+            .values_list("username", "id")
+        )
+
+    missing = [name for name in first_line if name not in authors]
+    if missing:
+        line = min(first_line[name] for name in missing)
+        name = next(name for name in missing if first_line[name] == line)
+        raise BundleError(f"Línea {line}: el autor '{name}' no existe")
+    return authors
+
+
+class Importer:
+    """
+    Importa registros por lotes: cada IMPORT_BATCH_SIZE registros se hace
+    un bulk_create de historias y otro de episodios en una transacción.
+    Las historias cuyo slug ya existe se saltan junto con sus episodios.
+    """
+
+    def __init__(self, author=None, batch_size=IMPORT_BATCH_SIZE, dry_run=False, authors=None):
+        self.author = author
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        # {usuario: id}, p. ej. lo que devuelve check_bundle
+        self.authors = dict(authors or {})
+        self.categories = {}
+        self.story_ids = {}
+        self.skipped_slugs = set()
+        self.imported_story_ids = []
+        self.stats = {"stories": 0, "episodes": 0, "skipped": 0}
+        self._stories = []
+        self._episodes = []
+
+    def run(self, records):
+        for record in records:
+            if record["type"] == "story":
+                self._stories.append(record)
+            else:
+                self._episodes.append(record)
+            if len(self._stories) + len(self._episodes) >= self.batch_size:
+                self.flush()
+        self.flush()
+
+        if self.imported_story_ids and not self.dry_run:
+            self.refresh_derived()
+        return self.stats
+
+    # Lookups con caché local: una consulta por autor/categoría distinta
+    def _author_id(self, record):
+        if self.author is not None:
+            return self.author.id
+        username = record.get("author")
+        if username not in self.authors:
+            self.authors[username] = (
+                User.objects.filter(username=username).values_list("id", flat=True).first()
+            )
+        if self.authors[username] is None:
+            raise BundleError(f"Línea {record['_line']}: el autor '{username}' no existe")
+        return self.authors[username]
+
+    def _category_id(self, record):
+        slug = record.get("category")
+        if not slug:
+            return None
+        if slug not in self.categories:
+            category = Category.objects.filter(slug=slug).first()
+            if category is None:
+                category = Category.objects.create(name=slug.replace("-", " ").capitalize(), slug=slug)
+            self.categories[slug] = category.id
+        return self.categories[slug]
+
+    def flush(self):
+        if not self._stories and not self._episodes:
+            return
+        stories, self._stories = self._stories, []
+        episodes, self._episodes = self._episodes, []
+
+        with transaction.atomic():
+            self._create_stories(stories)
+            self._create_episodes(episodes)
+            if self.dry_run:
+                transaction.set_rollback(True)
+
+    def _create_stories(self, records):
+        for record in records:
+            record["slug"] = record.get("slug") or slugify(record["title"])
+
+        existing = set(
+            Story.objects.filter(slug__in=[record["slug"] for record in records])
+            .values_list("slug", flat=True)
+        )
+
+        new = []
+        for record in records:
+            slug = record["slug"]
+            if slug in existing or slug in self.story_ids:
+                self.skipped_slugs.add(slug)
+                self.stats["skipped"] += 1
+                continue
+            new.append(Story(
+                slug=slug,
+                title=record["title"],
+                description=record.get("description", ""),
+                author_id=self._author_id(record),
+                category_id=self._category_id(record),
+                status=record.get("status", "draft"),
+            ))
+
+        # bulk_create devuelve los ids en SQLite y PostgreSQL
+        Story.objects.bulk_create(new, batch_size=self.batch_size)
+        for story in new:
+            self.story_ids[story.slug] = story.id
+            self.imported_story_ids.append(story.id)
+        self.stats["stories"] += len(new)
+
+    def _create_episodes(self, records):
+        new = []
+        for record in records:
+            slug = record.get("story")
+            if slug in self.skipped_slugs:
+                continue
+            story_id = self.story_ids.get(slug)
+            if story_id is None:
+                raise BundleError(f"Línea {record['_line']}: el episodio no sigue a su historia '{slug}'")
+
+            content = record.get("content", "")
+            new.append(Episode(
+                story_id=story_id,
+                number=record["number"],
+                title=record["title"],
+                content=content,
+                # bulk_create no pasa por Episode.save()
+                content_hash=Episode.hash_content(content),
+                word_count=Episode.count_words(content),
+            ))
+
+        Episode.objects.bulk_create(new, batch_size=self.batch_size)
+        self.stats["episodes"] += len(new)
+
+    def refresh_derived(self):
+        """bulk_create no emite señales: índices y cachés se ponen al día aquí."""
+        for story_id in self.imported_story_ids:
+            search.index_story(story_id)
+        story_stats.rebuild(self.imported_story_ids)
+        autocomplete.invalidate()
+        bump_version(LISTS_SCOPE)
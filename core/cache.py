@@ -0,0 +1,47 @@
+from django.core.cache import cache
+
+from .routers import primary_reads
+
+
+# ===========================
+#      CLAVES VERSIONADAS
+# ===========================
+# En vez de borrar claves concretas, cada grupo de datos tiene un número de
+# versión que forma parte de la clave. Para invalidar basta con incrementar
+# la versión: las entradas antiguas dejan de leerse y caducan solas.
+
+
+def get_version(name):
+    key = f"version:{name}"
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(name):
+    key = f"version:{name}"
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # La clave no existía (o fue expulsada): empezamos en 2 para no
+        # reutilizar entradas guardadas con la versión 1
+        cache.set(key, 2, timeout=None)
+        return 2
+
+
+def versioned_key(name, *parts):
+    suffix = ":".join(str(part) for part in parts)
+    return f"{name}:v{get_version(name)}:{suffix}"
+
+
+def get_or_set_versioned(name, parts, compute, timeout=None):
+    key = versioned_key(name, *parts)
+    value = cache.get(key)
+    if value is None:
+        # Lo que se guarda sale del primario, no de una réplica con retraso
+        with primary_reads():
+            value = compute()
+        cache.set(key, value, timeout)
+    return value
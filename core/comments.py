@@ -0,0 +1,23 @@
+from .models import Comment
+from .pagination import keyset_paginate
+
+
+# ===========================
+#      CARGADOR DE COMENTARIOS
+# ===========================
+COMMENTS_PER_PAGE = 20
+
+# Más recientes primero; el id desempata comentarios del mismo instante
+COMMENT_ORDERING = ("-created_at", "-id")
+
+
+def load_comments(episode, cursor=None, per_page=COMMENTS_PER_PAGE):
+    """
+    Devuelve una página de comentarios del episodio con el usuario y su
+    perfil (avatar) en la misma consulta, paginada por cursor.
+    """
+    queryset = (
+        Comment.objects.filter(episode=episode)
+        .select_related("user", "user__profile")
+    )
+    return keyset_paginate(queryset, COMMENT_ORDERING, cursor=cursor, per_page=per_page)
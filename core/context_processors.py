@@ -1,13 +1,37 @@
+from django.utils.functional import SimpleLazyObject
+
+from .cache import get_or_set_versioned
 from .models import Category
 from .models import Favorite
 
+# Los valores se calculan solo si la plantilla los usa, y se guardan en
+# caché con claves versionadas que invalidan las señales de core.signals.
+CONTEXT_CACHE_TIMEOUT = 60 * 60
+
+
+def _categories():
+    return get_or_set_versioned(
+        "categories_nav", (),
+        lambda: list(Category.objects.all().order_by("name")),
+        timeout=CONTEXT_CACHE_TIMEOUT,
+    )
+
+
+def _favorite_ids(user_id):
+    return get_or_set_versioned(
+        f"favorites:{user_id}", (),
+        lambda: set(Favorite.objects.filter(user_id=user_id).values_list("story_id", flat=True)),
+        timeout=CONTEXT_CACHE_TIMEOUT,
+    )
+
+
 def categories_nav(request):
     return {
-        "categories_nav": Category.objects.all().order_by("name")
+        "categories_nav": SimpleLazyObject(_categories)
     }
 
 def favorite_stories(request):
     if request.user.is_authenticated:
-        fav_ids = Favorite.objects.filter(user=request.user).values_list("story_id", flat=True)
-        return {"favorite_stories_ids": list(fav_ids)}
+        user_id = request.user.id
+        return {"favorite_stories_ids": SimpleLazyObject(lambda: _favorite_ids(user_id))}
     return {"favorite_stories_ids": []}
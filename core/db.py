@@ -0,0 +1,76 @@
+import logging
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, connection
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+logger = logging.getLogger(__name__)
+
+
+# ===========================
+#      AJUSTES DE SQLITE
+# ===========================
+# Cada conexión nueva aplica SQLITE_PRAGMAS. Lo importante es el modo WAL:
+# los lectores no bloquean al escritor ni al revés, y con
+# synchronous=NORMAL cada commit no espera un fsync. El resto (mmap,
+# cache_size) reduce lecturas de disco.
+#
+# Aun así solo hay un escritor a la vez. Las transacciones de Django
+# empiezan en modo DEFERRED: si una lee y luego quiere escribir mientras
+# otra escribe, SQLite devuelve "database is locked" al momento, sin
+# esperar el busy_timeout. Por eso las vistas que escriben se envuelven
+# con @retry_on_lock.
+
+
+def sqlite_pragmas():
+    # Única fuente: settings.SQLITE_PRAGMAS (sin valores por defecto aquí)
+    return getattr(settings, "SQLITE_PRAGMAS", {})
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+# ---------------------------
+#   Reintentos
+# ---------------------------
+def is_lock_error(exc):
+    message = str(exc).lower()
+    return "database is locked" in message or "database table is locked" in message
+
+
+def retry_on_lock(view=None, *, attempts=None, base_delay=0.05):
+    """
+    Repite la vista si SQLite devuelve "database is locked", con espera
+    exponencial y algo de azar para que los procesos no choquen otra vez.
+    Solo reintenta fuera de una transacción: dentro de una, lo hecho hasta
+    el error ya no es fiable.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            total = attempts or getattr(settings, "SQLITE_LOCK_RETRIES", 5)
+            for attempt in range(1, total + 1):
+                try:
+                    return view(request, *args, **kwargs)
+                except OperationalError as exc:
+                    if attempt == total or not is_lock_error(exc) or connection.in_atomic_block:
+                        raise
+                    delay = base_delay * 2 ** (attempt - 1) * (0.5 + random.random())
+                    logger.info("Base de datos bloqueada en %s, reintento %s en %.3fs", request.path, attempt, delay)
+                    time.sleep(delay)
+        return wrapper
+
+    if view is not None:
+        return decorator(view)
+    return decorator
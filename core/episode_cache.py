@@ -0,0 +1,61 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.defaultfilters import linebreaks
+from django.utils.safestring import mark_safe
+
+from .models import Episode
+
+
+# ===========================
+#      HTML CACHEADO DE EPISODIOS
+# ===========================
+# El cuerpo de un episodio casi nunca cambia tras publicarse, así que se
+# guarda ya renderizado (|linebreaks) con clave id + hash del contenido.
+# La vista carga el episodio sin la columna `content`: en un acierto el
+# texto no sale de la base de datos.
+
+_counters = {"hits": 0, "misses": 0}
+_counters_lock = threading.Lock()
+
+
+def _key(episode_id, content_hash):
+    return f"episode_html:{episode_id}:{content_hash}"
+
+
+def _count(name):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def get_stats():
+    with _counters_lock:
+        stats = dict(_counters)
+    total = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = round(stats["hits"] / total, 3) if total else None
+    return stats
+
+
+def rendered_content(episode):
+    """HTML del contenido del episodio, desde caché si es posible."""
+    key = _key(episode.id, episode.content_hash)
+    html = cache.get(key)
+
+    if html is not None:
+        _count("hits")
+        return mark_safe(html)
+
+    _count("misses")
+    if "content" in episode.get_deferred_fields():
+        content = Episode.objects.filter(id=episode.id).values_list("content", flat=True).first() or ""
+    else:
+        content = episode.content
+
+    html = str(linebreaks(content, autoescape=True))
+    cache.set(key, html, getattr(settings, "EPISODE_HTML_CACHE_TIMEOUT", 7 * 24 * 60 * 60))
+    return mark_safe(html)
+
+
+def invalidate(episode_id, content_hash):
+    cache.delete(_key(episode_id, content_hash))
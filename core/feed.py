@@ -0,0 +1,172 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import Episode, Follow, Profile, TimelineEntry
+from .routers import primary_reads
+
+
+# ===========================
+#      FEED DE SEGUIDOS
+# ===========================
+# Fan-out en escritura: al publicar un episodio se inserta una entrada en
+# la timeline de cada seguidor (en lotes, desde la cola de tareas), y leer
+# el feed es una sola consulta por rango sobre (user, -created_at).
+#
+# Los autores con más de FEED_FANOUT_MAX_FOLLOWERS seguidores no hacen
+# fan-out (serían demasiadas filas por episodio): sus episodios se mezclan
+# al leer el feed de quienes los siguen.
+
+FANOUT_BATCH_SIZE = 1000
+CELEBRITIES_CACHE_KEY = "feed:celebrities"
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def is_celebrity(author_id):
+    return Profile.objects.filter(
+        user_id=author_id,
+        followers_count__gt=_setting("FEED_FANOUT_MAX_FOLLOWERS", 10000),
+    ).exists()
+
+
+def celebrity_ids():
+    ids = cache.get(CELEBRITIES_CACHE_KEY)
+    if ids is None:
+        with primary_reads():
+            ids = list(
+                Profile.objects.filter(followers_count__gt=_setting("FEED_FANOUT_MAX_FOLLOWERS", 10000))
+                .values_list("user_id", flat=True)
+            )
+        cache.set(CELEBRITIES_CACHE_KEY, ids, 10 * 60)
+    return ids
+
+
+# ---------------------------
+#   Escritura
+# ---------------------------
+def fan_out_episode(episode_id):
+    """Inserta el episodio en la timeline de los seguidores del autor."""
+    episode = (
+        Episode.objects.select_related("story")
+        .only("id", "created_at", "story__id", "story__author_id", "story__status")
+        .filter(id=episode_id)
+        .first()
+    )
+    # Los episodios de un borrador no avisan a nadie
+    if episode is None or episode.story.status != "published":
+        return 0
+
+    author_id = episode.story.author_id
+    if is_celebrity(author_id):
+        return 0
+
+    follower_ids = (
+        Follow.objects.filter(following_id=author_id)
+        .order_by("follower_id")
+        .values_list("follower_id", flat=True)
+    )
+
+    total = 0
+    batch = []
+    for follower_id in follower_ids.iterator(chunk_size=FANOUT_BATCH_SIZE):
+        batch.append(follower_id)
+        if len(batch) >= FANOUT_BATCH_SIZE:
+            total += _insert_batch(episode, batch)
+            batch = []
+    if batch:
+        total += _insert_batch(episode, batch)
+    return total
+
+
+def _insert_batch(episode, user_ids):
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user_id=user_id,
+                episode_id=episode.id,
+                story_id=episode.story.id,
+                created_at=episode.created_at,
+            )
+            for user_id in user_ids
+        ],
+        ignore_conflicts=True,
+    )
+    trim_timelines(user_ids)
+    return len(user_ids)
+
+
+def trim_timelines(user_ids):
+    """Deja como mucho FEED_MAX_ENTRIES entradas por usuario."""
+    ranked = (
+        TimelineEntry.objects.filter(user_id__in=user_ids)
+        .annotate(position=Window(
+            RowNumber(),
+            partition_by=F("user_id"),
+            order_by=[F("created_at").desc(), F("id").desc()],
+        ))
+        .filter(position__gt=_setting("FEED_MAX_ENTRIES", 500))
+        .values_list("id", flat=True)
+    )
+    stale = list(ranked)
+    if stale:
+        TimelineEntry.objects.filter(id__in=stale).delete()
+
+
+def forget_author(user_id, author_id):
+    """Al dejar de seguir, se quitan sus episodios de la timeline."""
+    TimelineEntry.objects.filter(user_id=user_id, story__author_id=author_id).delete()
+
+
+# ---------------------------
+#   Lectura
+# ---------------------------
+class FeedItem:
+    def __init__(self, episode, story, created_at):
+        self.episode = episode
+        self.story = story
+        self.created_at = created_at
+
+
+def get_feed(user, limit=20):
+    entries = [
+        FeedItem(entry.episode, entry.story, entry.created_at)
+        # La historia puede haber vuelto a borrador después del fan-out
+        for entry in TimelineEntry.objects.filter(user=user, story__status="published")
+        .select_related("episode", "story", "story__author")
+        .only(
+            "created_at",
+            "episode__id", "episode__number", "episode__title",
+            "story__id", "story__slug", "story__title", "story__author__username",
+        )
+        .order_by("-created_at", "-id")[:limit]
+    ]
+
+    # Fan-out en lectura: autores muy seguidos a los que sigue el usuario
+    celebrities = celebrity_ids()
+    if celebrities:
+        episodes = (
+            Episode.objects.filter(
+                story__author_id__in=celebrities,
+                story__author__followers__follower=user,
+                story__status="published",
+            )
+            .select_related("story", "story__author")
+            .only(
+                "id", "number", "title", "created_at",
+                "story__id", "story__slug", "story__title", "story__author__username",
+            )
+            .order_by("-created_at")[:limit]
+        )
+        seen = {item.episode.id for item in entries}
+        entries += [
+            FeedItem(episode, episode.story, episode.created_at)
+            for episode in episodes if episode.id not in seen
+        ]
+        entries.sort(key=lambda item: item.created_at, reverse=True)
+        entries = entries[:limit]
+
+    return entries
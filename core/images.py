@@ -0,0 +1,155 @@
+import hashlib
+import logging
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+logger = logging.getLogger(__name__)
+
+
+# ===========================
+#      MINIATURAS / VARIANTES
+# ===========================
+# Cada imagen subida se reduce a varios anchos fijos en WebP y JPEG. Los
+# ficheros se guardan por contenido (hash SHA-256 del original), así la
+# misma imagen subida dos veces (p. ej. la portada por defecto) se procesa
+# y almacena una sola vez:
+#   derivatives/<ab>/<hash>/<ancho>.webp
+#   derivatives/<ab>/<hash>/<ancho>.jpg
+#
+# Nunca se amplía: los anchos mayores que el original se reducen al ancho
+# del original y los repetidos se descartan. El ancho del original se
+# guarda en el modelo (cover_width / avatar_width) para que el srcset
+# anuncie los anchos reales de cada fichero.
+
+COVER_WIDTHS = (320, 640, 960)
+AVATAR_WIDTHS = (64, 128, 256)
+
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+DERIVATIVES_DIR = "derivatives"
+
+# Etiqueta EXIF de orientación; 5-8 giran la imagen 90°
+EXIF_ORIENTATION = 0x0112
+ROTATED = (5, 6, 7, 8)
+
+
+def variant_path(content_hash, width, ext):
+    return f"{DERIVATIVES_DIR}/{content_hash[:2]}/{content_hash}/{width}.{ext}"
+
+
+def variant_url(content_hash, width, ext):
+    return default_storage.url(variant_path(content_hash, width, ext))
+
+
+def variant_widths(widths, source_width):
+    """
+    Anchos que existen de verdad para un original de `source_width` px.
+    Con 0 (imágenes procesadas antes de guardar el ancho) se usan los fijos.
+    """
+    if not source_width:
+        return list(widths)
+    return sorted({min(width, source_width) for width in widths})
+
+
+def _encode(image, fmt):
+    name, options = FORMATS[fmt]
+    if name == "JPEG" and image.mode != "RGB":
+        # JPEG no tiene transparencia: la aplanamos sobre fondo blanco
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        rgba = image.convert("RGBA")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, name, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(field_file, widths):
+    """
+    Genera las variantes de `field_file` y devuelve (hash de contenido,
+    ancho del original), o ("", 0) si no hay imagen o no se puede leer.
+    """
+    if not field_file or not field_file.name:
+        return "", 0
+
+    try:
+        field_file.open("rb")
+        try:
+            data = field_file.read()
+        finally:
+            field_file.close()
+    except (FileNotFoundError, OSError, ValueError):
+        logger.warning("No se encontró la imagen %s", field_file.name)
+        return "", 0
+
+    content_hash = hashlib.sha256(data).hexdigest()
+
+    # DecompressionBombError: dimensiones absurdas (más del doble de
+    # Image.MAX_IMAGE_PIXELS); no es un OSError y tumbaría el worker
+    try:
+        # Image.open solo lee la cabecera: el ancho sale sin decodificar
+        source = Image.open(BytesIO(data))
+        source_width, source_height = source.size
+        if source.getexif().get(EXIF_ORIENTATION) in ROTATED:
+            source_width = source_height
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        logger.warning("No se pudo procesar la imagen %s", field_file.name)
+        return "", 0
+
+    targets = variant_widths(widths, source_width)
+
+    # Ya procesada antes (misma imagen): no hay nada que hacer
+    if all(
+        default_storage.exists(variant_path(content_hash, width, ext))
+        for width in targets for ext in FORMATS
+    ):
+        return content_hash, source_width
+
+    try:
+        source = ImageOps.exif_transpose(source)
+        source.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        logger.warning("No se pudo procesar la imagen %s", field_file.name)
+        return "", 0
+
+    if source.mode not in ("RGB", "RGBA"):
+        source = source.convert("RGBA" if "A" in source.getbands() else "RGB")
+
+    for width in targets:
+        height = max(1, round(source.height * width / source.width))
+        resized = source.resize((width, height), Image.LANCZOS) if width != source.width else source
+
+        for ext in FORMATS:
+            path = variant_path(content_hash, width, ext)
+            if not default_storage.exists(path):
+                default_storage.save(path, ContentFile(_encode(resized, ext)))
+
+    return content_hash, source_width
+
+
+# ---------------------------
+#   Procesado por modelo
+# ---------------------------
+def process_story_cover(story):
+    from .models import Story
+
+    content_hash, width = generate_variants(story.cover_image, COVER_WIDTHS)
+    Story.objects.filter(id=story.id).update(cover_hash=content_hash, cover_width=width)
+    story.cover_hash, story.cover_width = content_hash, width
+    return content_hash
+
+
+def process_avatar(profile):
+    from .models import Profile
+
+    content_hash, width = generate_variants(profile.avatar, AVATAR_WIDTHS)
+    Profile.objects.filter(id=profile.id).update(avatar_hash=content_hash, avatar_width=width)
+    profile.avatar_hash, profile.avatar_width = content_hash, width
+    return content_hash
@@ -0,0 +1,55 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide latencia y consultas SQL de todas las vistas sobre datos sintéticos "
+        "(en una base de datos de prueba aparte) y guarda el resultado en JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scales", default="1,5",
+            help="Escalas de datos separadas por comas (ver generate_data --scale). Por defecto 1,5.",
+        )
+        parser.add_argument("--requests", type=int, default=20, help="Peticiones por ruta (por defecto 20).")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", default=None, help="Fichero JSON (por defecto benchmark-<commit>.json).")
+        parser.add_argument("--compare", default=None, help="JSON anterior con el que comparar.")
+
+    def handle(self, *args, **options):
+        try:
+            scales = [float(value) for value in options["scales"].split(",") if value.strip()]
+        except ValueError:
+            raise CommandError("--scales debe ser una lista de números, p. ej. 1,5,20")
+
+        previous = None
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as fp:
+                previous = json.load(fp)
+
+        # Cliente de pruebas: ALLOWED_HOSTS con 'testserver' y correo en memoria
+        setup_test_environment()
+        try:
+            results = benchmark.run(scales, options["requests"], seed=options["seed"], stdout=self.stdout)
+        finally:
+            teardown_test_environment()
+
+        output = options["output"] or f"benchmark-{results['meta']['commit'] or 'local'}.json"
+        with open(output, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {output}"))
+
+        if previous is not None:
+            self.stdout.write(f"\nComparación con {options['compare']} (p50 ms / consultas):")
+            for scale, route, old_ms, new_ms, old_q, new_q in benchmark.compare(previous, results):
+                change = (new_ms - old_ms) / old_ms * 100 if old_ms else 0
+                self.stdout.write(
+                    f"  x{scale:<5g} {route:<32} {old_ms:>8.2f} → {new_ms:>8.2f} ({change:+.0f}%)   "
+                    f"{old_q:>5} → {new_q:>5}"
+                )
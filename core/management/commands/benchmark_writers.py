@@ -0,0 +1,148 @@
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import setup_test_environment
+
+from core.models import Episode, Story
+from core.synthetic import generate
+
+
+# Ajustes "antes": lo que SQLite hace sin configurar nada
+BASELINE_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+
+def _writer(db_path, pragmas, retries, user_id, sample, seconds, queue):
+    """Proceso escritor: favoritos, seguimientos y comentarios a través de las vistas."""
+    settings.DATABASES["default"]["NAME"] = db_path
+    settings.DATABASES["default"].setdefault("OPTIONS", {})["timeout"] = pragmas.get("busy_timeout", 5000) / 1000
+    settings.SQLITE_PRAGMAS = pragmas
+    settings.SQLITE_LOCK_RETRIES = retries
+    connections.close_all()
+
+    rng = random.Random(os.getpid())
+    done = failed = 0
+    latencies = []
+
+    # Pase lo que pase, el proceso padre recibe un resultado (si no, esperaría para siempre)
+    try:
+        client = Client(raise_request_exception=False)
+        client.force_login(User.objects.get(id=user_id))
+        ajax = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            operation = rng.random()
+            start = time.perf_counter()
+            if operation < 0.4:
+                response = client.get(f"/favorito/{rng.choice(sample['story_ids'])}/", **ajax)
+            elif operation < 0.7:
+                response = client.get(f"/seguir/{rng.choice(sample['usernames'])}/", **ajax)
+            else:
+                response = client.post(sample["episode_url"], {"text": "Comentario de carga"})
+            latencies.append(time.perf_counter() - start)
+
+            if response.status_code >= 500:
+                failed += 1
+            else:
+                done += 1
+    except Exception:
+        failed += 1
+    finally:
+        connections.close_all()
+        queue.put((done, failed, latencies))
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide cuántas escrituras por segundo aguantan varios procesos a la vez sobre SQLite, "
+        "sin ajustes y con los de core.db (WAL, PRAGMAs y reintentos)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8, help="Procesos escritores (por defecto 8).")
+        parser.add_argument("--seconds", type=float, default=10, help="Duración de cada pasada.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Este benchmark es solo para SQLite.")
+
+        setup_test_environment()
+        workdir = tempfile.mkdtemp(prefix="storyverse-writers-")
+        template = os.path.join(workdir, "template.sqlite3")
+
+        try:
+            sample, user_ids = self.prepare(template, options["workers"])
+            runs = (
+                ("sin ajustes", BASELINE_PRAGMAS, 1),
+                ("WAL + reintentos", getattr(settings, "SQLITE_PRAGMAS", {}), getattr(settings, "SQLITE_LOCK_RETRIES", 5)),
+            )
+            for number, (label, pragmas, retries) in enumerate(runs):
+                path = os.path.join(workdir, f"run{number}.sqlite3")
+                shutil.copy(template, path)
+                self.report(label, self.run(path, pragmas, retries, user_ids, sample, options))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def prepare(self, path, workers):
+        """Base de datos nueva con migraciones y algunos datos sintéticos."""
+
+        settings.DATABASES["default"]["NAME"] = path
+        connections.close_all()
+        call_command("migrate", verbosity=0)
+        generate(scale=0.5, prefix="w")
+
+        story = Story.published.filter(episodes__isnull=False).first()
+        episode = Episode.objects.filter(story=story).order_by("number").first()
+        users = list(User.objects.order_by("id").values_list("id", "username")[: max(workers * 4, 20)])
+        sample = {
+            "story_ids": list(Story.published.values_list("id", flat=True)[:50]),
+            "usernames": [username for _, username in users],
+            "episode_url": f"/historia/{story.slug}/episodio/{episode.number}/",
+        }
+        connections.close_all()
+        return sample, [user_id for user_id, _ in users]
+
+    def run(self, path, pragmas, retries, user_ids, sample, options):
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        processes = [
+            context.Process(
+                target=_writer,
+                args=(path, pragmas, retries, user_id, sample, options["seconds"], queue),
+            )
+            # Un usuario distinto por proceso, como lectores reales
+            for user_id in user_ids[: options["workers"]]
+        ]
+        start = time.monotonic()
+        for process in processes:
+            process.start()
+        results = [queue.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.monotonic() - start
+
+        latencies = sorted(latency for _, _, items in results for latency in items)
+        return {
+            "done": sum(done for done, _, _ in results),
+            "failed": sum(failed for _, failed, _ in results),
+            "elapsed": elapsed,
+            "p50": latencies[len(latencies) // 2] if latencies else 0,
+            "p99": latencies[int(len(latencies) * 0.99)] if latencies else 0,
+        }
+
+    def report(self, label, result):
+        self.stdout.write(
+            f"{label:<18} {result['done'] / result['elapsed']:>8.1f} escrituras/s   "
+            f"errores {result['failed']:>5}   p50 {result['p50'] * 1000:>7.1f} ms   "
+            f"p99 {result['p99'] * 1000:>7.1f} ms"
+        )
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.rankings import compute_rankings
+
+
+class Command(BaseCommand):
+    help = "Recalcula los rankings de tendencias y populares (StoryRanking)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=None,
+            help="Repite el cálculo cada N segundos (sin cron).",
+        )
+
+    def handle(self, *args, **options):
+        every = options["every"]
+
+        while True:
+            start = time.monotonic()
+            total = compute_rankings()
+            elapsed = time.monotonic() - start
+            self.stdout.write(self.style.SUCCESS(f"{total} historias clasificadas en {elapsed:.2f}s."))
+
+            if not every:
+                break
+            try:
+                time.sleep(max(every - elapsed, 0))
+            except KeyboardInterrupt:
+                break
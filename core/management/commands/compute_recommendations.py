@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from core.recommendations import FavoriteMatrix, compute_neighbors, compute_recommendations
+
+
+class Command(BaseCommand):
+    help = "Recalcula las historias similares (StoryNeighbor) a partir de los favoritos."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recalcula todas las historias (por defecto, solo las afectadas por favoritos nuevos).",
+        )
+        parser.add_argument(
+            "--benchmark",
+            action="store_true",
+            help="Mide el cálculo sobre datos sintéticos, sin tocar la base de datos.",
+        )
+        parser.add_argument("--users", type=int, default=100_000, help="Usuarios sintéticos (--benchmark).")
+        parser.add_argument("--stories", type=int, default=50_000, help="Historias sintéticas (--benchmark).")
+        parser.add_argument(
+            "--favorites-per-user", type=int, default=20,
+            help="Media de favoritos por usuario sintético (--benchmark).",
+        )
+        parser.add_argument("--sample", type=int, default=None, help="Historias a calcular (--benchmark).")
+
+    def handle(self, *args, **options):
+        if options["benchmark"]:
+            return self.benchmark(options)
+
+        start = time.monotonic()
+        total = compute_recommendations(full=options["full"])
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(f"{total} historias recalculadas en {elapsed:.2f}s."))
+
+    def benchmark(self, options):
+        rng = np.random.default_rng(42)
+        n_users, n_stories = options["users"], options["stories"]
+
+        # Popularidad tipo Zipf: pocas historias acaparan muchos favoritos
+        per_user = rng.poisson(options["favorites_per_user"], n_users)
+        total = int(per_user.sum())
+        user_ids = np.repeat(np.arange(n_users), per_user)
+        weights = 1.0 / np.arange(1, n_stories + 1) ** 0.8
+        story_ids = rng.choice(n_stories, size=total, p=weights / weights.sum())
+
+        self.stdout.write(f"{n_users} usuarios × {n_stories} historias, {total} favoritos.")
+
+        start = time.monotonic()
+        matrix = FavoriteMatrix(user_ids, story_ids, max_user_favorites=500)
+        built = time.monotonic() - start
+
+        items = np.arange(len(matrix))
+        if options["sample"]:
+            items = rng.choice(items, size=min(options["sample"], len(items)), replace=False)
+
+        start = time.monotonic()
+        pairs = sum(len(neighbors) for _, neighbors in compute_neighbors(matrix, items, top_k=10, min_common=2))
+        elapsed = time.monotonic() - start
+
+        per_story = elapsed / max(len(items), 1)
+        self.stdout.write(f"Matriz: {built:.2f}s")
+        self.stdout.write(
+            f"Vecinas: {len(items)} historias en {elapsed:.2f}s "
+            f"({per_story * 1000:.2f} ms/historia, {pairs} pares guardables)"
+        )
+        if len(items) < len(matrix):
+            self.stdout.write(f"Estimado para las {len(matrix)} historias: {per_story * len(matrix):.0f}s")
@@ -0,0 +1,36 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.bundles import export_records, open_bundle, write_records
+from core.models import Story
+
+
+class Command(BaseCommand):
+    help = "Exporta historias y episodios a JSON Lines (.jsonl o .jsonl.gz)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Fichero de salida ('-' para la salida estándar).")
+        parser.add_argument("--story", action="append", default=[], help="Slug de una historia (repetible).")
+        parser.add_argument("--author", help="Solo las historias de este usuario.")
+
+    def handle(self, *args, **options):
+        stories = Story.objects.all()
+        if options["story"]:
+            stories = stories.filter(slug__in=options["story"])
+        if options["author"]:
+            stories = stories.filter(author__username=options["author"])
+
+        start = time.monotonic()
+        if options["output"] == "-":
+            count, size = write_records(export_records(stories), sys.stdout)
+        else:
+            with open_bundle(options["output"], "w") as fp:
+                count, size = write_records(export_records(stories), fp)
+        elapsed = max(time.monotonic() - start, 1e-6)
+
+        self.stderr.write(
+            f"{count} registros ({size / 1_000_000:.1f} MB) en {elapsed:.2f}s: "
+            f"{count / elapsed:.0f} registros/s, {size / 1_000_000 / elapsed:.1f} MB/s"
+        )
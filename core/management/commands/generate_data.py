@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.synthetic import PASSWORD, SIZES, generate
+
+
+class Command(BaseCommand):
+    help = "Genera usuarios, historias, episodios, comentarios, favoritos y seguimientos de prueba."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale", type=float, default=1,
+            help="Multiplica los tamaños base (%s)." % ", ".join(f"{k}={v}" for k, v in SIZES.items()),
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Semilla (misma semilla, mismos datos).")
+        parser.add_argument("--prefix", default="sv", help="Prefijo de usuarios y slugs generados.")
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        created = generate(
+            scale=options["scale"], seed=options["seed"], prefix=options["prefix"], stdout=self.stdout,
+        )
+        elapsed = time.monotonic() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{sum(created.values())} filas en {elapsed:.1f}s. "
+            f"Contraseña de los usuarios: '{PASSWORD}'."
+        ))
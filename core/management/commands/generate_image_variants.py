@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from core.images import process_avatar, process_story_cover
+from core.models import Profile, Story
+
+
+class Command(BaseCommand):
+    help = "Genera las miniaturas WebP/JPEG de portadas y avatares que aún no las tienen."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Regenera también las imágenes que ya tienen miniaturas.",
+        )
+
+    def handle(self, *args, **options):
+        stories = Story.objects.only("id", "cover_image", "cover_hash", "cover_width")
+        profiles = Profile.objects.only("id", "avatar", "avatar_hash", "avatar_width")
+        if not options["all"]:
+            # Sin ancho: sin miniaturas o procesadas antes de guardarlo
+            stories = stories.filter(cover_width=0)
+            profiles = profiles.filter(avatar_width=0)
+
+        covers = sum(1 for story in stories.iterator(chunk_size=100) if process_story_cover(story))
+        avatars = sum(1 for profile in profiles.iterator(chunk_size=100) if process_avatar(profile))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{covers} portadas y {avatars} avatares procesados."
+        ))
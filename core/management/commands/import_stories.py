@@ -0,0 +1,52 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.bundles import IMPORT_BATCH_SIZE, BundleError, Importer, check_bundle, open_bundle, read_records
+
+
+class Command(BaseCommand):
+    help = "Importa historias y episodios desde JSON Lines (.jsonl o .jsonl.gz)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="Fichero exportado con export_stories.")
+        parser.add_argument("--author", help="Asigna todas las historias a este usuario.")
+        parser.add_argument(
+            "--batch-size", type=int, default=IMPORT_BATCH_SIZE,
+            help=f"Registros por lote y transacción (por defecto {IMPORT_BATCH_SIZE}).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Valida el fichero sin guardar nada.")
+
+    def handle(self, *args, **options):
+        author = None
+        if options["author"]:
+            author = User.objects.filter(username=options["author"]).first()
+            if author is None:
+                raise CommandError(f"El usuario '{options['author']}' no existe.")
+
+        start = time.monotonic()
+        try:
+            # Primero se valida el fichero entero (sin guardar nada): un error
+            # en la última línea no debe dejar guardados los lotes anteriores
+            with open_bundle(options["input"], "r") as fp:
+                authors = check_bundle(read_records(fp), author=author)
+            importer = Importer(
+                author=author, batch_size=options["batch_size"], dry_run=options["dry_run"], authors=authors,
+            )
+            with open_bundle(options["input"], "r") as fp:
+                stats = importer.run(read_records(fp))
+        except (BundleError, KeyError) as exc:
+            raise CommandError(f"Importación detenida: {exc}")
+        elapsed = max(time.monotonic() - start, 1e-6)
+
+        records = stats["stories"] + stats["episodes"]
+        message = (
+            f"{stats['stories']} historias y {stats['episodes']} episodios "
+            f"({stats['skipped']} historias ya existían) en {elapsed:.2f}s: "
+            f"{records / elapsed:.0f} registros/s"
+        )
+        if options["dry_run"]:
+            self.stdout.write(message + " (sin cambios)")
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
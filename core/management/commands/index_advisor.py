@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.query_plans import analyze
+from core.synthetic import generate, test_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta EXPLAIN sobre las consultas canónicas de cada vista y avisa de "
+        "recorridos completos de tabla y ordenaciones sin índice."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale", type=float, default=None,
+            help="Analiza una base de prueba nueva con datos sintéticos de esta escala (para CI).",
+        )
+        parser.add_argument("--verbose-plans", action="store_true", help="Muestra el plan completo de cada consulta.")
+        parser.add_argument("--fail", action="store_true", help="Termina con error si hay avisos.")
+
+    def handle(self, *args, **options):
+        if options["scale"] is None:
+            warnings = self.report(options)
+        else:
+            with test_database():
+                generate(scale=options["scale"], prefix="advisor")
+                warnings = self.report(options)
+
+        if warnings and options["fail"]:
+            raise CommandError(f"{warnings} consultas con avisos.")
+
+    def report(self, options):
+        warnings = 0
+        for name, plan, problems in analyze():
+            if problems:
+                warnings += 1
+                self.stdout.write(self.style.WARNING(f"✗ {name}: {'; '.join(problems)}"))
+            else:
+                self.stdout.write(f"✓ {name}")
+            if options["verbose_plans"] or problems:
+                for line in plan.splitlines():
+                    self.stdout.write(f"      {line}")
+
+        summary = f"{warnings} consultas con avisos."
+        self.stdout.write(self.style.WARNING(summary) if warnings else self.style.SUCCESS("Sin avisos."))
+        return warnings
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core import search
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el índice de búsqueda de texto completo de las historias."
+
+    def handle(self, *args, **options):
+        if search.backend() is None:
+            self.stdout.write("Este motor de base de datos no tiene índice de texto completo.")
+            return
+
+        total = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"{total} historias indexadas."))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.story_stats import REBUILD_CHUNK_SIZE, rebuild, recount_words
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula StoryStats (episodios, palabras, comentarios y última actividad) "
+        "desde las tablas, por bloques de historias."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=REBUILD_CHUNK_SIZE,
+            help=f"Historias por bloque (por defecto {REBUILD_CHUNK_SIZE}).",
+        )
+        parser.add_argument(
+            "--recount-words", action="store_true",
+            help="Vuelve a contar las palabras de cada episodio antes de sumar.",
+        )
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+
+        if options["recount_words"]:
+            episodes = recount_words()
+            self.stdout.write(f"{episodes} episodios recontados.")
+
+        total = rebuild(chunk_size=options["chunk_size"])
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(f"Estadísticas de {total} historias recalculadas en {elapsed:.2f}s."))
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from core.models import Story
+
+
+class Command(BaseCommand):
+    help = "Recalcula Story.favorites_count a partir de la tabla Favorite y corrige las diferencias."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo muestra las diferencias, sin guardar cambios.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        fixed = 0
+
+        stories = (
+            Story.objects.annotate(real_count=Count("favorited_by"))
+            .only("id", "title", "favorites_count")
+            .order_by("id")
+        )
+
+        with transaction.atomic():
+            for story in stories.iterator(chunk_size=500):
+                if story.favorites_count == story.real_count:
+                    continue
+
+                self.stdout.write(
+                    f"{story.title}: {story.favorites_count} → {story.real_count}"
+                )
+                fixed += 1
+                if not dry_run:
+                    Story.objects.filter(id=story.id).update(favorites_count=story.real_count)
+
+        if dry_run:
+            self.stdout.write(f"{fixed} historias con contador desfasado (sin cambios).")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{fixed} historias corregidas."))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from core.models import Follow, Profile
+
+
+class Command(BaseCommand):
+    help = "Recalcula followers_count y following_count de los perfiles a partir de Follow."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo muestra las diferencias, sin guardar cambios.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+
+        followers = dict(
+            Follow.objects.values("following").annotate(total=Count("id")).values_list("following", "total")
+        )
+        following = dict(
+            Follow.objects.values("follower").annotate(total=Count("id")).values_list("follower", "total")
+        )
+
+        fixed = 0
+        profiles = (
+            Profile.objects.select_related("user")
+            .only("id", "user__username", "followers_count", "following_count")
+            .order_by("id")
+        )
+
+        with transaction.atomic():
+            for profile in profiles.iterator(chunk_size=500):
+                real_followers = followers.get(profile.user_id, 0)
+                real_following = following.get(profile.user_id, 0)
+
+                if (profile.followers_count, profile.following_count) == (real_followers, real_following):
+                    continue
+
+                self.stdout.write(
+                    f"@{profile.user.username}: seguidores {profile.followers_count} → {real_followers}, "
+                    f"siguiendo {profile.following_count} → {real_following}"
+                )
+                fixed += 1
+                if not dry_run:
+                    Profile.objects.filter(id=profile.id).update(
+                        followers_count=real_followers,
+                        following_count=real_following,
+                    )
+
+        if dry_run:
+            self.stdout.write(f"{fixed} perfiles con contadores desfasados (sin cambios).")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{fixed} perfiles corregidos."))
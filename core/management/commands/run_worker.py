@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError
+
+from core import taskqueue
+
+
+class Command(BaseCommand):
+    help = "Ejecuta las tareas en segundo plano (correo, imágenes, contadores)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=4, help="Hilos del pool (por defecto 4).")
+        parser.add_argument("--batch", type=int, default=None, help="Tareas reservadas por lote.")
+        parser.add_argument("--poll", type=float, default=1.0, help="Segundos de espera si la cola está vacía.")
+        parser.add_argument(
+            "--stale-after", type=int, default=600,
+            help="Segundos tras los que una tarea 'en curso' se considera abandonada.",
+        )
+        parser.add_argument(
+            "--purge-every", type=int, default=300,
+            help="Segundos entre purgas de tareas terminadas (TASKS_KEEP_DONE / TASKS_KEEP_FAILED).",
+        )
+        parser.add_argument("--once", action="store_true", help="Vacía la cola y termina.")
+
+    def handle(self, *args, **options):
+        threads = options["threads"]
+        batch = options["batch"] or threads * 2
+        processed = 0
+        last_purge = 0
+
+        self.stdout.write(f"Worker iniciado ({threads} hilos).")
+
+        with taskqueue.make_executor(threads) as executor:
+            try:
+                while True:
+                    try:
+                        taskqueue.release_stale(options["stale_after"])
+                        if time.monotonic() - last_purge >= options["purge_every"]:
+                            taskqueue.purge_finished()
+                            last_purge = time.monotonic()
+                        done = taskqueue.process_batch(executor, batch)
+                    except OperationalError as exc:
+                        # P. ej. "database is locked" al reservar: se reintenta en la siguiente vuelta
+                        self.stderr.write(f"Error de base de datos en el worker: {exc}")
+                        done = 0
+                    processed += done
+
+                    if not done:
+                        if options["once"]:
+                            break
+                        time.sleep(options["poll"])
+            except KeyboardInterrupt:
+                pass
+
+        self.stdout.write(self.style.SUCCESS(f"{processed} tareas procesadas."))
@@ -0,0 +1,34 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.routers import PRIMARY_ALIAS, REPLICA_ALIAS, has_replica
+
+
+class Command(BaseCommand):
+    help = (
+        "Copia el primario SQLite sobre la réplica (DB_REPLICA_NAME). Sirve para probar "
+        "en local el enrutado a la réplica: entre dos copias, la réplica va 'retrasada'."
+    )
+
+    def handle(self, *args, **options):
+        if not has_replica():
+            raise CommandError("No hay réplica configurada (DB_REPLICA_NAME).")
+
+        primary = connections[PRIMARY_ALIAS].settings_dict
+        replica = connections[REPLICA_ALIAS].settings_dict
+        if primary["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("Con PostgreSQL la réplica la mantiene la replicación del servidor.")
+
+        connections.close_all()
+        source = sqlite3.connect(str(primary["NAME"]))
+        target = sqlite3.connect(str(replica["NAME"]))
+        try:
+            # API de copia en caliente de SQLite: consistente aunque haya escrituras
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Réplica actualizada: {replica['NAME']}"))
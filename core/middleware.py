@@ -0,0 +1,175 @@
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .routers import RoutingState, has_replica, routing
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+# ===========================
+#      MÉTRICAS SQL POR VISTA
+# ===========================
+# Acumulado en memoria por proceso, indexado por nombre de URL.
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_query_stats():
+    with _stats_lock:
+        return {name: dict(data) for name, data in _stats.items()}
+
+
+def reset_query_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _record(url_name, queries, sql_ms, slowest_ms, slowest_sql, total_ms):
+    with _stats_lock:
+        data = _stats.setdefault(url_name, {
+            "requests": 0,
+            "queries": 0,
+            "max_queries": 0,
+            "sql_ms": 0.0,
+            "total_ms": 0.0,
+            "slowest_ms": 0.0,
+            "slowest_sql": "",
+        })
+        data["requests"] += 1
+        data["queries"] += queries
+        data["max_queries"] = max(data["max_queries"], queries)
+        data["sql_ms"] += sql_ms
+        data["total_ms"] += total_ms
+        if slowest_ms > data["slowest_ms"]:
+            data["slowest_ms"] = slowest_ms
+            data["slowest_sql"] = slowest_sql
+
+
+class QueryCollector:
+    """execute_wrapper que cuenta y cronometra cada consulta."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest_ms = 0.0
+        self.slowest_sql = ""
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.total_ms += elapsed
+            if elapsed > self.slowest_ms:
+                self.slowest_ms = elapsed
+                self.slowest_sql = sql
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Mide número de consultas, tiempo total de SQL y la consulta más lenta
+    de cada petición. Lo expone en la cabecera Server-Timing y lo acumula
+    por nombre de URL para la vista /metricas/.
+
+    settings.QUERY_BUDGETS = {"url_name": max_consultas} define un
+    presupuesto por vista; si QUERY_BUDGET_STRICT es True (p. ej. en los
+    tests) superarlo lanza QueryBudgetExceeded, si no solo se registra.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        collector = QueryCollector()
+        start = time.perf_counter()
+
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(collector))
+            response = self.get_response(request)
+
+        total_ms = (time.perf_counter() - start) * 1000
+        match = getattr(request, "resolver_match", None)
+        url_name = match.url_name if match and match.url_name else "(sin nombre)"
+
+        _record(
+            url_name,
+            collector.count,
+            collector.total_ms,
+            collector.slowest_ms,
+            collector.slowest_sql,
+            total_ms,
+        )
+
+        response["Server-Timing"] = (
+            f'db;dur={collector.total_ms:.2f};desc="{collector.count} queries", '
+            f'app;dur={total_ms:.2f}'
+        )
+
+        self.check_budget(url_name, collector.count)
+        return response
+
+    def check_budget(self, url_name, count):
+        budget = getattr(settings, "QUERY_BUDGETS", {}).get(url_name)
+        if budget is None or count <= budget:
+            return
+
+        message = f"La vista '{url_name}' hizo {count} consultas (presupuesto: {budget})"
+        if getattr(settings, "QUERY_BUDGET_STRICT", False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+# ===========================
+#      RÉPLICA DE LECTURA
+# ===========================
+PIN_COOKIE = "db_pin"
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Activa las lecturas desde la réplica (core.routers) en las vistas de
+    settings.REPLICA_VIEWS, salvo que el navegador esté "fijado" al
+    primario porque escribió hace menos de REPLICA_PIN_SECONDS.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with routing(RoutingState()) as state:
+            request.db_routing = state
+            response = self.get_response(request)
+
+        if state.wrote and has_replica():
+            pin_seconds = getattr(settings, "REPLICA_PIN_SECONDS", 10)
+            response.set_cookie(
+                PIN_COOKIE, str(int(time.time()) + pin_seconds),
+                max_age=pin_seconds, httponly=True, samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return None
+        if request.resolver_match.url_name not in getattr(settings, "REPLICA_VIEWS", ()):
+            return None
+
+        try:
+            pinned = int(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            pinned = False
+        request.db_routing.replica_reads = not pinned
+        return None
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.2 on 2026-10-18 15:47
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_favorites_count(apps, schema_editor):
+    Story = apps.get_model('core', 'Story')
+    Favorite = apps.get_model('core', 'Favorite')
+
+    counts = (
+        Favorite.objects.filter(story=OuterRef('pk'))
+        .order_by()
+        .values('story')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    Story.objects.update(favorites_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_alter_story_cover_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='story',
+            name='favorites_count',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_favorites_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.0.2 on 2026-10-18 18:05
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE core_story_fts USING fts5("
+            "title, description, category, episodes, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            "INSERT INTO core_story_fts (rowid, title, description, category, episodes) "
+            "SELECT s.id, s.title, s.description, COALESCE(c.name, ''), "
+            "COALESCE((SELECT group_concat(e.title || char(10) || e.content, char(10)) "
+            "          FROM core_episode e WHERE e.story_id = s.id), '') "
+            "FROM core_story s LEFT JOIN core_category c ON c.id = s.category_id"
+        )
+
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE core_story_fts ("
+            "story_id bigint PRIMARY KEY REFERENCES core_story (id) ON DELETE CASCADE "
+            "DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX core_story_fts_document_idx ON core_story_fts USING GIN (document)"
+        )
+        schema_editor.execute(
+            "INSERT INTO core_story_fts (story_id, document) "
+            "SELECT s.id, "
+            "setweight(to_tsvector('spanish', s.title), 'A') || "
+            "setweight(to_tsvector('spanish', s.description), 'B') || "
+            "setweight(to_tsvector('spanish', COALESCE(c.name, '')), 'C') || "
+            "setweight(to_tsvector('spanish', COALESCE((SELECT string_agg(e.title || ' ' || e.content, ' ') "
+            "          FROM core_episode e WHERE e.story_id = s.id), '')), 'D') "
+            "FROM core_story s LEFT JOIN core_category c ON c.id = s.category_id"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute("DROP TABLE IF EXISTS core_story_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_story_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
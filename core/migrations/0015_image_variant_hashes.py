@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-18 15:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_story_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='avatar_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='story',
+            name='cover_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
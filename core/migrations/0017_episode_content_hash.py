@@ -0,0 +1,30 @@
+# Generated by Django 5.0.2 on 2026-10-18 15:55
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_content_hash(apps, schema_editor):
+    Episode = apps.get_model('core', 'Episode')
+
+    for episode in Episode.objects.only('id', 'content').iterator(chunk_size=200):
+        Episode.objects.filter(id=episode.id).update(
+            content_hash=hashlib.sha1(episode.content.encode()).hexdigest()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_task'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='episode',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
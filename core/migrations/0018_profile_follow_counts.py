@@ -0,0 +1,45 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_follow_counts(apps, schema_editor):
+    Profile = apps.get_model('core', 'Profile')
+    Follow = apps.get_model('core', 'Follow')
+
+    def count_of(field):
+        return Coalesce(Subquery(
+            Follow.objects.filter(**{field: OuterRef('user_id')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('id'))
+            .values('total')
+        ), 0)
+
+    Profile.objects.update(
+        followers_count=count_of('following'),
+        following_count=count_of('follower'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_episode_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_follow_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_timelineentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReadingProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scroll_percent', models.PositiveSmallIntegerField(default=0)),
+                ('updated_at', models.DateTimeField()),
+                ('episode', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.episode')),
+                ('story', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.story')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reading_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-updated_at'], name='progress_user_updated_idx')],
+                'unique_together': {('user', 'story')},
+            },
+        ),
+    ]
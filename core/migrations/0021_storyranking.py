@@ -0,0 +1,29 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_readingprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoryRanking',
+            fields=[
+                ('story', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='core.story')),
+                ('trending_score', models.FloatField(default=0)),
+                ('popular_score', models.FloatField(default=0)),
+                ('views_score', models.FloatField(default=0)),
+                ('views_seen', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField()),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.category')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-trending_score', 'story'], name='ranking_trending_idx'), models.Index(fields=['-popular_score', 'story'], name='ranking_popular_idx'), models.Index(fields=['category', '-trending_score', 'story'], name='ranking_cat_trending_idx')],
+            },
+        ),
+    ]
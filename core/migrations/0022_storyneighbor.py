@@ -0,0 +1,29 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_storyranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoryNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('computed_at', models.DateTimeField()),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.story')),
+                ('story', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='core.story')),
+            ],
+            options={
+                'ordering': ['rank'],
+                'unique_together': {('story', 'rank')},
+            },
+        ),
+    ]
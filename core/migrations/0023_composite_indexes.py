@@ -0,0 +1,35 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_storyneighbor'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['episode', '-created_at', '-id'], name='comment_episode_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['user', '-created_at'], name='favorite_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='story',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='story_category_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='story',
+            index=models.Index(fields=['author', '-created_at'], name='story_author_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='story',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='story_status_created_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_composite_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='story',
+            name='story_category_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='story',
+            name='story_status_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='story',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['-created_at', '-id'], name='story_published_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='story',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['category', '-created_at', '-id'], name='story_published_cat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='story',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['-favorites_count', '-id'], name='story_published_popular_idx'),
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+
+
+def backfill_word_count(apps, schema_editor):
+    Episode = apps.get_model('core', 'Episode')
+
+    batch = []
+    for episode in Episode.objects.only('id', 'content').order_by('id').iterator(chunk_size=500):
+        episode.word_count = len(episode.content.split())
+        batch.append(episode)
+        if len(batch) >= 500:
+            Episode.objects.bulk_update(batch, ['word_count'])
+            batch = []
+    if batch:
+        Episode.objects.bulk_update(batch, ['word_count'])
+
+
+def _by_story(queryset, story_field, **aggregates):
+    return {
+        row.pop(story_field): row
+        for row in queryset.order_by().values(story_field).annotate(**aggregates)
+    }
+
+
+def create_story_stats(apps, schema_editor):
+    # Una fila por historia existente; las señales solo actualizan filas que ya existen
+    Story = apps.get_model('core', 'Story')
+    Episode = apps.get_model('core', 'Episode')
+    Comment = apps.get_model('core', 'Comment')
+    Favorite = apps.get_model('core', 'Favorite')
+    StoryStats = apps.get_model('core', 'StoryStats')
+
+    stories = list(Story.objects.order_by('id').values_list('id', 'created_at'))
+    for start in range(0, len(stories), 1000):
+        chunk = stories[start:start + 1000]
+        story_ids = [story_id for story_id, _ in chunk]
+        episodes = _by_story(
+            Episode.objects.filter(story_id__in=story_ids), 'story_id',
+            total=Count('id'), words=Sum('word_count'), last=Max('created_at'),
+        )
+        comments = _by_story(
+            Comment.objects.filter(episode__story_id__in=story_ids), 'episode__story_id',
+            total=Count('id'), last=Max('created_at'),
+        )
+        favorites = _by_story(
+            Favorite.objects.filter(story_id__in=story_ids), 'story_id', last=Max('created_at'),
+        )
+
+        rows = []
+        for story_id, created_at in chunk:
+            episode = episodes.get(story_id, {})
+            comment = comments.get(story_id, {})
+            activity = [
+                created_at, episode.get('last'), comment.get('last'),
+                favorites.get(story_id, {}).get('last'),
+            ]
+            rows.append(StoryStats(
+                story_id=story_id,
+                episodes=episode.get('total', 0),
+                words=episode.get('words') or 0,
+                comments=comment.get('total', 0),
+                last_activity=max(moment for moment in activity if moment is not None),
+            ))
+        StoryStats.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_published_stories'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoryStats',
+            fields=[
+                ('story', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='core.story')),
+                ('episodes', models.PositiveIntegerField(default=0)),
+                ('words', models.PositiveIntegerField(default=0)),
+                ('comments', models.PositiveIntegerField(default=0)),
+                ('last_activity', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Estadísticas de historia',
+                'verbose_name_plural': 'Estadísticas de historias',
+            },
+        ),
+        migrations.AddField(
+            model_name='episode',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_word_count, migrations.RunPython.noop),
+        migrations.RunPython(create_story_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_story_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='avatar_width',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='story',
+            name='cover_width',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
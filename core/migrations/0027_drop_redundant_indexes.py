@@ -0,0 +1,35 @@
+# Generated by Django 5.0.2 on 2026-10-18 16:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_image_widths'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='story',
+            name='story_created_id_idx',
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='episode',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='core.episode'),
+        ),
+        migrations.AlterField(
+            model_name='favorite',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='favorites', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='story',
+            name='author',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
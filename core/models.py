@@ -1,4 +1,7 @@
+import hashlib
+
 from django.db import models
+from django.utils import timezone
 from django.utils.text import slugify
 from django.contrib.auth.models import User
 
@@ -26,6 +29,15 @@ class Category(models.Model):
 # ===========================
 #      STORY
 # ===========================
+class PublishedStoryManager(models.Manager):
+    """
+    Solo historias publicadas: lo que se muestra en las vistas públicas.
+    Sus consultas usan los índices parciales "story_published_*".
+    """
+    def get_queryset(self):
+        return super().get_queryset().filter(status="published")
+
+
 class Story(models.Model):
     STATUS_CHOICES = (
         ("draft", "Borrador"),
@@ -35,7 +47,8 @@ class Story(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, blank=True)
     description = models.TextField()
-    author = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Sin índice propio: story_author_created_idx empieza por author
+    author = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True)
     cover_image = models.ImageField(
         upload_to="covers/",
@@ -43,22 +56,45 @@ class Story(models.Model):
         blank=True,
         null=True
     )
+    # Hash del contenido de la portada: localiza sus miniaturas (core.images)
+    cover_hash = models.CharField(max_length=64, blank=True, editable=False)
+    cover_width = models.PositiveIntegerField(default=0, editable=False)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="draft")
     views = models.PositiveIntegerField(default=0)
+    # ⭐ Contador desnormalizado de favoritos (lo mantiene toggle_favorite)
+    favorites_count = models.PositiveIntegerField(default=0, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # `objects` (todas, también borradores) sigue siendo el manager por
+    # defecto: admin, relaciones y vistas del autor. Las públicas usan `published`.
+    objects = models.Manager()
+    published = PublishedStoryManager()
+
     class Meta:
         verbose_name = "Historia"
         verbose_name_plural = "Historias"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["author", "-created_at"], name="story_author_created_idx"),
+            # Índices parciales: los listados públicos (y su paginación por
+            # cursor) solo recorren las publicadas
+            models.Index(
+                fields=["-created_at", "-id"], name="story_published_created_idx",
+                condition=models.Q(status="published"),
+            ),
+            models.Index(
+                fields=["category", "-created_at", "-id"], name="story_published_cat_idx",
+                condition=models.Q(status="published"),
+            ),
+            models.Index(
+                fields=["-favorites_count", "-id"], name="story_published_popular_idx",
+                condition=models.Q(status="published"),
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
-    # ⭐ NUEVO: Contador usando el modelo Favorite
-    def favorites_count(self):
-        return self.favorited_by.count()
-
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
@@ -84,6 +120,10 @@ class Episode(models.Model):
     number = models.PositiveIntegerField()
     title = models.CharField(max_length=200)
     content = models.TextField()
+    # Hash del contenido: forma parte de la clave del HTML cacheado
+    content_hash = models.CharField(max_length=40, blank=True, editable=False)
+    # Palabras del contenido: StoryStats suma la diferencia al editar
+    word_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -95,11 +135,26 @@ class Episode(models.Model):
     def __str__(self):
         return f"{self.story.title} - {self.title}"
 
+    @staticmethod
+    def hash_content(content):
+        return hashlib.sha1(content.encode()).hexdigest()
+
+    @staticmethod
+    def count_words(content):
+        return len(content.split())
+
+    def save(self, *args, **kwargs):
+        if "content" not in self.get_deferred_fields():
+            self.content_hash = self.hash_content(self.content)
+            self.word_count = self.count_words(self.content)
+        super().save(*args, **kwargs)
+
 # ===========================
 #      COMMENT
 # ===========================
 class Comment(models.Model):
-    episode = models.ForeignKey(Episode, on_delete=models.CASCADE, related_name="comments")
+    # Sin índice propio: comment_episode_created_idx empieza por episode
+    episode = models.ForeignKey(Episode, on_delete=models.CASCADE, related_name="comments", db_index=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -108,6 +163,10 @@ class Comment(models.Model):
         verbose_name = "Comentario"
         verbose_name_plural = "Comentarios"
         ordering = ["created_at"]
+        indexes = [
+            # Comentarios de un episodio, más recientes primero (core.comments)
+            models.Index(fields=["episode", "-created_at", "-id"], name="comment_episode_created_idx"),
+        ]
 
     def __str__(self):
         return f"Comentario de {self.user.username}"
@@ -124,9 +183,14 @@ class Profile(models.Model):
         blank=True,
         null=True
     )
+    # Hash del contenido del avatar: localiza sus miniaturas (core.images)
+    avatar_hash = models.CharField(max_length=64, blank=True, editable=False)
+    avatar_width = models.PositiveIntegerField(default=0, editable=False)
     bio = models.TextField(max_length=300, blank=True)
     email_verified = models.BooleanField(default=False)
-
+    # Contadores desnormalizados de Follow (los mantiene core.signals)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"Perfil de {self.user.username}"
@@ -136,12 +200,159 @@ class Profile(models.Model):
 #      FAVORITE (Nuevo)
 # ===========================
 class Favorite(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="favorites")
+    # Sin índice propio: (user, story) único y favorite_user_created_idx empiezan por user
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="favorites", db_index=False)
     story = models.ForeignKey(Story, on_delete=models.CASCADE, related_name="favorited_by")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         unique_together = ("user", "story")
+        indexes = [
+            # Biblioteca del usuario, últimos favoritos primero
+            models.Index(fields=["user", "-created_at"], name="favorite_user_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.username} → {self.story.title}"
+
+
+# ===========================
+#      TAREAS EN SEGUNDO PLANO
+# ===========================
+class Task(models.Model):
+    STATUS_CHOICES = (
+        ("pending", "Pendiente"),
+        ("running", "En curso"),
+        ("done", "Completada"),
+        ("failed", "Fallida"),
+    )
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Tarea"
+        verbose_name_plural = "Tareas"
+        ordering = ["run_at", "id"]
+        indexes = [
+            models.Index(fields=["status", "run_at"], name="task_status_run_at_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
+
+
+# ===========================
+#      TIMELINE (feed de seguidos)
+# ===========================
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="timeline")
+    episode = models.ForeignKey(Episode, on_delete=models.CASCADE, related_name="+")
+    story = models.ForeignKey(Story, on_delete=models.CASCADE, related_name="+")
+    # Fecha de publicación del episodio (no de la inserción)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("user", "episode")
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-id"], name="timeline_user_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} ← {self.episode}"
+
+
+# ===========================
+#      PROGRESO DE LECTURA
+# ===========================
+class ReadingProgress(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="reading_progress")
+    story = models.ForeignKey(Story, on_delete=models.CASCADE, related_name="+")
+    episode = models.ForeignKey(Episode, on_delete=models.CASCADE, related_name="+")
+    scroll_percent = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("user", "story")
+        indexes = [
+            models.Index(fields=["user", "-updated_at"], name="progress_user_updated_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} → {self.episode} ({self.scroll_percent}%)"
+
+
+# ===========================
+#      RANKINGS (TENDENCIAS / POPULARES)
+# ===========================
+# Tabla materializada: la rellena `manage.py compute_rankings` y las
+# vistas solo leen el top-N por índice.
+class StoryRanking(models.Model):
+    story = models.OneToOneField(Story, on_delete=models.CASCADE, primary_key=True, related_name="ranking")
+    # Copia de story.category para el top-N por categoría sin JOIN
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, related_name="+")
+    trending_score = models.FloatField(default=0)
+    popular_score = models.FloatField(default=0)
+    # Parte de visitas del trending (con decaimiento) y visitas ya contadas
+    views_score = models.FloatField(default=0)
+    views_seen = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-trending_score", "story"], name="ranking_trending_idx"),
+            models.Index(fields=["-popular_score", "story"], name="ranking_popular_idx"),
+            models.Index(fields=["category", "-trending_score", "story"], name="ranking_cat_trending_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.story} ({self.trending_score:.1f})"
+
+
+# ===========================
+#      ESTADÍSTICAS POR HISTORIA
+# ===========================
+# Una fila por historia para el panel del autor, al día por señales
+# (core.story_stats). Favoritos y visitas ya están en Story.
+class StoryStats(models.Model):
+    story = models.OneToOneField(Story, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    episodes = models.PositiveIntegerField(default=0)
+    words = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+    # Último episodio, comentario, favorito o lote de visitas
+    last_activity = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Estadísticas de historia"
+        verbose_name_plural = "Estadísticas de historias"
+
+    def __str__(self):
+        return f"{self.story} ({self.episodes} episodios)"
+
+
+# ===========================
+#      RECOMENDACIONES
+# ===========================
+# "A quienes les gustó esta historia también les gustó...": top-K vecinas
+# por similitud de favoritos, calculadas fuera de línea (core.recommendations).
+class StoryNeighbor(models.Model):
+    story = models.ForeignKey(Story, on_delete=models.CASCADE, related_name="neighbors")
+    neighbor = models.ForeignKey(Story, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("story", "rank")
+        ordering = ["rank"]
+
+    def __str__(self):
+        return f"{self.story} → {self.neighbor} ({self.score:.3f})"
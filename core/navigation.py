@@ -0,0 +1,69 @@
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+from .cache import bump_version, get_or_set_versioned
+from .models import Episode, Story
+
+
+# ===========================
+#      ÍNDICE DE NAVEGACIÓN
+# ===========================
+# Episodios: lista ordenada (número, título) de cada historia guardada en
+# caché; anterior / siguiente se resuelven con bisect, sin consultas. Las
+# señales suben la versión cuando cambian los episodios de la historia.
+#
+# Historias: dos consultas por clave primaria (la anterior y la siguiente
+# publicadas), O(log n) sin cargar ni invalidar una lista global.
+
+EpisodeEntry = namedtuple("EpisodeEntry", ["number", "title"])
+StoryEntry = namedtuple("StoryEntry", ["id", "slug", "title"])
+
+NAV_CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def episodes_nav_name(story_id):
+    return f"episodes_nav:{story_id}"
+
+
+def _episode_index(story_id):
+    # (números, entradas): las claves van aparte para poder hacer bisect
+    def build():
+        entries = [
+            EpisodeEntry(number, title)
+            for number, title in Episode.objects.filter(story_id=story_id)
+            .order_by("number").values_list("number", "title")
+        ]
+        return [entry.number for entry in entries], entries
+
+    return get_or_set_versioned(episodes_nav_name(story_id), (), build, timeout=NAV_CACHE_TIMEOUT)
+
+
+def _neighbors(keys, entries, key):
+    before = bisect_left(keys, key)
+    after = bisect_right(keys, key)
+    prev_entry = entries[before - 1] if before > 0 else None
+    next_entry = entries[after] if after < len(entries) else None
+    return prev_entry, next_entry
+
+
+def story_episodes(story_id):
+    """Episodios de la historia ordenados por número (tabla de contenidos)."""
+    return _episode_index(story_id)[1]
+
+
+def episode_neighbors(story_id, number):
+    return _neighbors(*_episode_index(story_id), number)
+
+
+def story_neighbors(story_id):
+    stories = Story.published.values_list("id", "slug", "title")
+    prev_row = stories.filter(id__lt=story_id).order_by("-id").first()
+    next_row = stories.filter(id__gt=story_id).order_by("id").first()
+    return (
+        StoryEntry(*prev_row) if prev_row else None,
+        StoryEntry(*next_row) if next_row else None,
+    )
+
+
+def invalidate_episodes(story_id):
+    bump_version(episodes_nav_name(story_id))
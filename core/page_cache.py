@@ -0,0 +1,100 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .cache import bump_version, get_version
+from .routers import primary_reads
+
+
+# ===========================
+#      CACHÉ DE PÁGINAS ANÓNIMAS
+# ===========================
+# Los visitantes sin sesión reciben la página ya renderizada, guardada por
+# URL. Cada página depende de uno o varios "ámbitos" con versión:
+#   - "pages:lists"          listados y portada (cualquier historia nueva/editada)
+#   - "pages:story:<slug>"   ficha de la historia y sus episodios
+# Las señales suben la versión del ámbito afectado (purga selectiva) y el
+# ETag cambia con ella, así navegadores y CDN reciben 304 mientras nada cambie.
+# Los usuarios autenticados nunca pasan por aquí: ven su estado de
+# favoritos/seguimiento.
+
+LISTS_SCOPE = "pages:lists"
+
+
+def story_scope(slug):
+    return f"pages:story:{slug}"
+
+
+def purge(*scopes):
+    """Invalida las páginas de los ámbitos indicados (tras el commit)."""
+    transaction.on_commit(lambda: [bump_version(scope) for scope in scopes])
+
+
+def _cacheable(request):
+    return request.method in ("GET", "HEAD") and not request.user.is_authenticated
+
+
+def anonymous_page_cache(scopes, on_hit=None):
+    """
+    Decorador de vista. `scopes(request, **kwargs)` devuelve los ámbitos de
+    la página; `on_hit(request, meta)` se llama cuando se sirve desde caché,
+    con lo que la vista dejó en `request.page_cache_meta`.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheable(request):
+                return view(request, *args, **kwargs)
+
+            versions = [f"{scope}={get_version(scope)}" for scope in scopes(request, **kwargs)]
+            # "Cargar más" pide la misma URL por AJAX y recibe JSON
+            ajax = request.headers.get("x-requested-with", "")
+            raw_key = f"{request.get_full_path()}|{ajax}|{'|'.join(versions)}"
+            key = "page:" + hashlib.md5(raw_key.encode()).hexdigest()
+
+            entry = cache.get(key)
+            if entry is not None:
+                if on_hit is not None:
+                    on_hit(request, entry["meta"])
+                response = get_conditional_response(
+                    request, etag=entry["etag"], last_modified=entry["last_modified"]
+                )
+                if response is None:
+                    response = HttpResponse(entry["content"], content_type=entry["content_type"])
+                return _finish(response, entry)
+
+            # La página se guardará: se renderiza con datos del primario
+            with primary_reads():
+                response = view(request, *args, **kwargs)
+
+            # Solo guardamos respuestas completas y sin cookies propias
+            if response.status_code != 200 or response.streaming or response.cookies:
+                return response
+
+            entry = {
+                "content": response.content,
+                "content_type": response["Content-Type"],
+                "etag": '"%s"' % hashlib.md5(raw_key.encode() + response.content).hexdigest(),
+                "last_modified": int(time.time()),
+                "meta": getattr(request, "page_cache_meta", None),
+            }
+            cache.set(key, entry, getattr(settings, "PAGE_CACHE_TIMEOUT", 10 * 60))
+            return _finish(response, entry)
+
+        return wrapper
+    return decorator
+
+
+def _finish(response, entry):
+    response["ETag"] = entry["etag"]
+    response["Last-Modified"] = http_date(entry["last_modified"])
+    response["Cache-Control"] = "public, max-age=0, must-revalidate"
+    patch_vary_headers(response, ("Cookie",))
+    return response
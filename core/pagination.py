@@ -0,0 +1,115 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+# ===========================
+#      PAGINACIÓN POR CURSOR (KEYSET)
+# ===========================
+# En lugar de OFFSET, cada página continúa desde la última fila vista:
+#   WHERE (campo, id) < (ultimo_valor, ultimo_id) ORDER BY campo DESC, id DESC LIMIT n
+# Así la página 100 cuesta lo mismo que la página 1 (usa el índice compuesto).
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Devuelve la lista de valores del cursor, o None si no es válido."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list):
+        return None
+    return values
+
+
+# Rango de un entero de SQLite / bigint de PostgreSQL
+MAX_INT = 2 ** 63 - 1
+
+
+def _parse_value(model, field_name, value):
+    field = model._meta.get_field(field_name)
+    if field.get_internal_type() == "DateTimeField":
+        return parse_datetime(value) if isinstance(value, str) else None
+    # 1e400 llega como inf: int(inf) lanza OverflowError
+    value = field.to_python(value)
+    if isinstance(value, int) and not -MAX_INT <= value <= MAX_INT:
+        # Cabría en Python pero no en la consulta (OverflowError al ejecutarla)
+        return None
+    return value
+
+
+def keyset_filter(queryset, ordering, values):
+    """
+    Filtra `queryset` para quedarse con las filas posteriores a `values`
+    según `ordering` (p. ej. ("-created_at", "-id")).
+    """
+    condition = Q()
+    equal = Q()
+
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+
+    return queryset.filter(condition)
+
+
+def keyset_paginate(queryset, ordering, cursor=None, per_page=24):
+    """
+    Devuelve una KeysetPage con como mucho `per_page` elementos.
+    El último campo de `ordering` debe ser único (normalmente "id"/"-id").
+    """
+    queryset = queryset.order_by(*ordering)
+
+    values = decode_cursor(cursor)
+    if values is not None and len(values) == len(ordering):
+        try:
+            parsed = [
+                _parse_value(queryset.model, field.lstrip("-"), value)
+                for field, value in zip(ordering, values)
+            ]
+        except (ValidationError, ValueError, TypeError, OverflowError):
+            parsed = None
+        if parsed is not None and None not in parsed:
+            queryset = keyset_filter(queryset, ordering, parsed)
+
+    # Pedimos una fila extra para saber si hay más páginas sin un COUNT(*)
+    items = list(queryset[:per_page + 1])
+    next_cursor = None
+
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = encode_cursor([
+            getattr(last, field.lstrip("-")) for field in ordering
+        ])
+
+    return KeysetPage(items, next_cursor)
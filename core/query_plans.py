@@ -0,0 +1,117 @@
+import re
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.utils import timezone
+
+from .comments import COMMENT_ORDERING
+from .models import (
+    Category, Comment, Episode, Favorite, Follow, ReadingProgress, Story, StoryNeighbor,
+    StoryRanking, Task, TimelineEntry,
+)
+from .pagination import keyset_filter
+
+
+# ===========================
+#      PLANES DE CONSULTA
+# ===========================
+# Consultas canónicas de cada vista (las que se repiten en cada petición)
+# y análisis de su plan con EXPLAIN. Se marcan:
+#   - recorridos completos de tabla (SQLite "SCAN tabla", PostgreSQL "Seq Scan")
+#   - ordenaciones sin índice (SQLite "USE TEMP B-TREE", PostgreSQL "Sort")
+#
+# Las órdenes de las vistas se repiten aquí a propósito: si una vista
+# cambia de orden o de filtro, hay que añadir aquí su nueva consulta.
+
+STORY_RECENT = ("-created_at", "-id")
+STORY_POPULAR = ("-favorites_count", "-id")
+
+
+def _sample():
+    """Valores reales para los filtros (o 1 si la tabla está vacía)."""
+    story = Story.published.order_by("id").first()
+    episode = Episode.objects.order_by("id").first()
+    return {
+        "user_id": User.objects.order_by("id").values_list("id", flat=True).first() or 1,
+        "story_id": story.id if story else 1,
+        "slug": story.slug if story else "x",
+        "author_id": story.author_id if story else 1,
+        "category_id": Category.objects.order_by("id").values_list("id", flat=True).first() or 1,
+        "episode_id": episode.id if episode else 1,
+        "created_at": story.created_at if story else timezone.now(),
+    }
+
+
+def canonical_queries():
+    """{'vista: descripción': queryset}"""
+    s = _sample()
+    after_story = [s["created_at"], s["story_id"]]
+    stories = Story.published.select_related("category")
+
+    return {
+        "home: recientes": stories.order_by(*STORY_RECENT)[:12],
+        "home: tendencias": StoryRanking.objects.order_by("-trending_score", "story_id")[:6],
+        "home: populares": StoryRanking.objects.order_by("-popular_score", "story_id")[:6],
+        "home: feed": TimelineEntry.objects.filter(user_id=s["user_id"], story__status="published")
+        .order_by("-created_at", "-id")[:10],
+        "story_list: recientes": stories.order_by(*STORY_RECENT)[:25],
+        "story_list: recientes, página 2": keyset_filter(
+            stories.order_by(*STORY_RECENT), STORY_RECENT, after_story
+        )[:25],
+        "story_list: populares": stories.order_by(*STORY_POPULAR)[:25],
+        "category_detail: recientes": stories.filter(category_id=s["category_id"]).order_by(*STORY_RECENT)[:25],
+        "category_detail: recientes, página 2": keyset_filter(
+            stories.filter(category_id=s["category_id"]).order_by(*STORY_RECENT), STORY_RECENT, after_story
+        )[:25],
+        "category_detail: tendencias": StoryRanking.objects.filter(category_id=s["category_id"])
+        .order_by("-trending_score", "story_id")[:3],
+        "story_detail: historia": Story.objects.filter(slug=s["slug"]),
+        "story_detail: favorito": Favorite.objects.filter(user_id=s["user_id"], story_id=s["story_id"]),
+        "story_detail: historia anterior": Story.published.filter(id__lt=s["story_id"]).order_by("-id")[:1],
+        "story_detail: historia siguiente": Story.published.filter(id__gt=s["story_id"]).order_by("id")[:1],
+        "story_detail: similares": StoryNeighbor.objects.filter(story_id=s["story_id"], rank__lte=6)
+        .select_related("neighbor"),
+        "story_detail: índice de episodios": Episode.objects.filter(story_id=s["story_id"]).order_by("number"),
+        "episode_detail: episodio": Episode.objects.filter(story__slug=s["slug"], number=1),
+        "episode_detail: comentarios": Comment.objects.filter(episode_id=s["episode_id"])
+        .order_by(*COMMENT_ORDERING)[:21],
+        "public_profile: historias": Story.published.filter(author_id=s["author_id"]).order_by("-created_at"),
+        "public_profile: ¿le sigue?": Follow.objects.filter(follower_id=s["user_id"], following_id=s["author_id"]),
+        "my_library: favoritos": Favorite.objects.filter(user_id=s["user_id"]).order_by("-created_at"),
+        "my_library: continuar leyendo": ReadingProgress.objects.filter(user_id=s["user_id"])
+        .order_by("-updated_at")[:12],
+        "my_stories: historias": Story.objects.filter(author_id=s["author_id"]).order_by("-created_at"),
+        "worker: tareas pendientes": Task.objects.filter(status="pending", run_at__lte=timezone.now())
+        .order_by("run_at", "id")[:8],
+        "worker: tareas caducadas": Task.objects.filter(status="done", finished_at__lt=timezone.now())
+        .values_list("id", flat=True)[:1000],
+    }
+
+
+# ---------------------------
+#   Análisis
+# ---------------------------
+SQLITE_FULL_SCAN = re.compile(r"\bSCAN (\w+)\b(?! USING)")
+SQLITE_TEMP_SORT = re.compile(r"USE TEMP B-TREE FOR (.+)")
+POSTGRES_FULL_SCAN = re.compile(r"Seq Scan on (\w+)")
+POSTGRES_SORT = re.compile(r"^\s*(?:->\s*)?Sort\b", re.MULTILINE)
+
+
+def problems(plan):
+    """Lista de avisos para el texto de un plan."""
+    found = []
+    if connection.vendor == "sqlite":
+        found += [f"recorrido completo de {table}" for table in SQLITE_FULL_SCAN.findall(plan)]
+        found += [f"ordenación temporal ({what.lower()})" for what in SQLITE_TEMP_SORT.findall(plan)]
+    elif connection.vendor == "postgresql":
+        found += [f"recorrido completo de {table}" for table in POSTGRES_FULL_SCAN.findall(plan)]
+        if POSTGRES_SORT.search(plan):
+            found.append("ordenación sin índice")
+    return found
+
+
+def analyze(queries=None):
+    """Genera (nombre, plan, avisos) para cada consulta canónica."""
+    for name, queryset in (queries or canonical_queries()).items():
+        plan = queryset.explain()
+        yield name, plan, problems(plan)
@@ -0,0 +1,157 @@
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .cache import bump_version
+from .models import Comment, Episode, Favorite, Story, StoryRanking
+from .page_cache import LISTS_SCOPE
+
+
+# ===========================
+#      RANKINGS
+# ===========================
+# `manage.py compute_rankings` (cron, o con --every) recalcula dos
+# puntuaciones por historia y las guarda en StoryRanking:
+#
+#   - trending: actividad reciente con decaimiento exponencial (vida media
+#     RANKINGS_HALF_LIFE_HOURS). Favoritos, comentarios y episodios nuevos
+#     tienen fecha y se ponderan por su antigüedad; las visitas solo son un
+#     contador, así que se decae lo acumulado y se suman las nuevas desde
+#     la pasada anterior (views_seen).
+#   - popular: totales de siempre.
+#
+# Las vistas leen el top-N por índice, sin agregaciones por petición.
+
+WEIGHTS = {
+    "views": 1.0,
+    "favorites": 10.0,
+    "comments": 5.0,
+    "episodes": 20.0,
+}
+
+SAVE_CHUNK_SIZE = 500
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _decay(age_seconds, half_life):
+    return 0.5 ** (max(age_seconds, 0) / half_life)
+
+
+def _recent_activity(model, story_field, since, now, half_life):
+    """Suma por historia de exp. decaída de cada evento desde `since`."""
+    scores = defaultdict(float)
+    events = (
+        model.objects.filter(created_at__gte=since)
+        .values_list(story_field, "created_at")
+    )
+    for story_id, created_at in events.iterator(chunk_size=2000):
+        scores[story_id] += _decay((now - created_at).total_seconds(), half_life)
+    return scores
+
+
+def _totals(model, story_field):
+    return dict(
+        model.objects.values(story_field)
+        .annotate(total=Count("id"))
+        .values_list(story_field, "total")
+    )
+
+
+def compute_rankings(now=None):
+    """Recalcula StoryRanking para las historias publicadas. Devuelve cuántas."""
+    now = now or timezone.now()
+    half_life = _setting("RANKINGS_HALF_LIFE_HOURS", 24) * 3600
+    # Más allá de ~10 vidas medias un evento ya no aporta nada visible
+    since = now - timedelta(seconds=half_life * 10)
+
+    recent = {
+        "favorites": _recent_activity(Favorite, "story_id", since, now, half_life),
+        "comments": _recent_activity(Comment, "episode__story_id", since, now, half_life),
+        "episodes": _recent_activity(Episode, "story_id", since, now, half_life),
+    }
+    comment_totals = _totals(Comment, "episode__story_id")
+    episode_totals = _totals(Episode, "story_id")
+
+    previous = {
+        story_id: (views_score, views_seen, computed_at)
+        for story_id, views_score, views_seen, computed_at in
+        StoryRanking.objects.values_list("story_id", "views_score", "views_seen", "computed_at")
+    }
+
+    rows = []
+    stories = Story.published.order_by("id").values_list("id", "category_id", "views", "favorites_count")
+    for story_id, category_id, views, favorites in stories.iterator(chunk_size=2000):
+        views_score, views_seen, computed_at = previous.get(story_id, (0.0, 0, now))
+        views_score = (
+            views_score * _decay((now - computed_at).total_seconds(), half_life)
+            + max(views - views_seen, 0)
+        )
+
+        trending = WEIGHTS["views"] * views_score + sum(
+            WEIGHTS[kind] * scores.get(story_id, 0.0) for kind, scores in recent.items()
+        )
+        popular = (
+            WEIGHTS["views"] * views
+            + WEIGHTS["favorites"] * favorites
+            + WEIGHTS["comments"] * comment_totals.get(story_id, 0)
+            + WEIGHTS["episodes"] * episode_totals.get(story_id, 0)
+        )
+
+        rows.append(StoryRanking(
+            story_id=story_id,
+            category_id=category_id,
+            trending_score=round(trending, 4),
+            # log: que una historia enorme no aplaste al resto por órdenes de magnitud
+            popular_score=round(math.log1p(popular), 4),
+            views_score=views_score,
+            views_seen=views,
+            computed_at=now,
+        ))
+
+    with transaction.atomic():
+        StoryRanking.objects.bulk_create(
+            rows,
+            batch_size=SAVE_CHUNK_SIZE,
+            update_conflicts=True,
+            unique_fields=["story"],
+            update_fields=[
+                "category", "trending_score", "popular_score",
+                "views_score", "views_seen", "computed_at",
+            ],
+        )
+        # Borradores y despublicadas: fuera de las listas
+        StoryRanking.objects.filter(computed_at__lt=now).delete()
+        # Portada y categorías cacheadas cambian de orden
+        transaction.on_commit(lambda: bump_version(LISTS_SCOPE))
+
+    return len(rows)
+
+
+# ---------------------------
+#   Lectura
+# ---------------------------
+def _top(order, queryset, category=None, limit=12):
+    """Top-N por índice (story_id) y luego las historias por PK: O(limit)."""
+    rankings = StoryRanking.objects.all()
+    if category is not None:
+        rankings = rankings.filter(category=category)
+    story_ids = list(rankings.order_by(order, "story_id").values_list("story_id", flat=True)[:limit])
+
+    stories = queryset.in_bulk(story_ids)
+    return [stories[story_id] for story_id in story_ids if story_id in stories]
+
+
+def trending(queryset, category=None, limit=12):
+    return _top("-trending_score", queryset, category, limit)
+
+
+def popular(queryset, category=None, limit=12):
+    return _top("-popular_score", queryset, category, limit)
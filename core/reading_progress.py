@@ -0,0 +1,95 @@
+from datetime import datetime
+
+from django.db import connection
+from django.utils import timezone
+
+from .buffers import TimedBuffer
+from .models import ReadingProgress
+from .taskqueue import enqueue
+
+
+# ===========================
+#      PROGRESO DE LECTURA
+# ===========================
+# El lector envía su posición (episodio + % de scroll) con un beacon cada
+# vez que sale de la página. Las posiciones se acumulan en memoria, una
+# por (usuario, historia) y la última gana, y se guardan en bloque con un
+# único INSERT ... ON CONFLICT DO UPDATE desde la cola de tareas.
+#
+# El UPDATE solo se aplica si la posición que llega es más reciente que la
+# guardada: dos workers (o un reintento) pueden escribir lotes fuera de
+# orden y una posición vieja no debe pisar a una nueva.
+
+SAVE_CHUNK_SIZE = 500
+
+
+class ProgressBuffer(TimedBuffer):
+    interval_setting = "READING_PROGRESS_FLUSH_INTERVAL"
+    size_setting = "READING_PROGRESS_FLUSH_SIZE"
+
+    def record(self, user_id, story_id, episode_id, percent):
+        self.put(
+            (user_id, story_id),
+            (episode_id, percent, timezone.now().isoformat()),
+        )
+
+    def write(self, pending):
+        # El guardado lo hace el worker de tareas (core.tasks.save_reading_progress)
+        enqueue(
+            "save_reading_progress",
+            {"entries": [
+                [user_id, story_id, episode_id, percent, updated_at]
+                for (user_id, story_id), (episode_id, percent, updated_at) in pending.items()
+            ]},
+        )
+
+
+progress_buffer = ProgressBuffer()
+
+
+def _upsert_sql(count):
+    qn = connection.ops.quote_name
+    table = qn(ReadingProgress._meta.db_table)
+    columns = ["user_id", "story_id", "episode_id", "scroll_percent", "updated_at"]
+    placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * count)
+    return (
+        f"INSERT INTO {table} ({', '.join(qn(c) for c in columns)}) VALUES {placeholders} "
+        f"ON CONFLICT ({qn('user_id')}, {qn('story_id')}) DO UPDATE SET "
+        + ", ".join(f"{qn(c)} = excluded.{qn(c)}" for c in columns[2:])
+        + f" WHERE excluded.{qn('updated_at')} > {table}.{qn('updated_at')}"
+    )
+
+
+def save_progress(entries):
+    """
+    Guarda [user_id, story_id, episode_id, percent, iso_fecha] en bloque.
+    Una fila existente solo se actualiza si la nueva fecha es posterior.
+    """
+    updated_at = ReadingProgress._meta.get_field("updated_at")
+    rows = [
+        [
+            user_id, story_id, episode_id, percent,
+            updated_at.get_db_prep_value(datetime.fromisoformat(moment), connection),
+        ]
+        for user_id, story_id, episode_id, percent, moment in entries
+    ]
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), SAVE_CHUNK_SIZE):
+            chunk = rows[start:start + SAVE_CHUNK_SIZE]
+            cursor.execute(_upsert_sql(len(chunk)), [value for row in chunk for value in row])
+    return len(rows)
+
+
+def continue_reading(user, limit=12):
+    """Últimas historias en curso del usuario, en una sola consulta."""
+    return (
+        ReadingProgress.objects.filter(user=user)
+        .select_related("story", "episode")
+        .only(
+            "scroll_percent", "updated_at",
+            "story__id", "story__slug", "story__title",
+            "story__cover_image", "story__cover_hash", "story__cover_width",
+            "episode__id", "episode__number", "episode__title",
+        )
+        .order_by("-updated_at")[:limit]
+    )
@@ -0,0 +1,207 @@
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Favorite, StoryNeighbor
+
+
+# ===========================
+#      RECOMENDACIONES
+# ===========================
+# Similitud coseno ítem-ítem sobre la matriz binaria usuario × historia de
+# favoritos:
+#
+#   sim(i, j) = comunes(i, j) / sqrt(favs(i) * favs(j))
+#
+# La matriz se guarda dispersa en dos índices tipo CSR (historia → usuarios
+# y usuario → historias) con arrays de NumPy. Para cada historia se juntan
+# las historias de sus lectores y np.unique cuenta los comunes: el coste
+# es proporcional a los pares reales, no a historias².
+#
+# `manage.py compute_recommendations` guarda las RECOMMENDATIONS_TOP_K
+# vecinas de cada historia en StoryNeighbor; servirlas es una consulta por
+# índice (story, rank) en core.similar, que no importa NumPy: este módulo
+# solo se carga en el worker y en los comandos que calculan.
+#
+# Incremental: solo se recalculan las historias tocadas por los favoritos
+# nuevos desde la última pasada (las de esos usuarios). Los favoritos
+# quitados y el cambio de normalización del resto se corrigen con --full.
+
+COMPUTE_BLOCK = 2000
+SAVE_CHUNK_SIZE = 1000
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class FavoriteMatrix:
+    """Matriz usuario × historia de favoritos, en formato CSR por ambos lados."""
+
+    def __init__(self, user_ids, story_ids, max_user_favorites=None):
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        story_ids = np.asarray(story_ids, dtype=np.int64)
+
+        self.story_keys, items = np.unique(story_ids, return_inverse=True)
+        self.user_keys, users = np.unique(user_ids, return_inverse=True)
+        n_users = len(self.user_keys)
+        n_items = len(self.story_keys)
+
+        # Matriz binaria: un mismo par (usuario, historia) cuenta una vez
+        pairs = np.unique(users * max(n_items, 1) + items)
+        users, items = pairs // max(n_items, 1), pairs % max(n_items, 1)
+
+        # Lectores con miles de favoritos aportan muchos pares y poca señal
+        user_degree = np.bincount(users, minlength=n_users)
+        if max_user_favorites:
+            keep = user_degree[users] <= max_user_favorites
+            users, items = users[keep], items[keep]
+
+        self.item_degree = np.bincount(items, minlength=n_items)
+
+        order = np.argsort(users, kind="stable")
+        self.user_items = items[order]
+        self.user_ptr = np.concatenate(([0], np.cumsum(np.bincount(users, minlength=n_users))))
+
+        order = np.argsort(items, kind="stable")
+        self.item_users = users[order]
+        self.item_ptr = np.concatenate(([0], np.cumsum(self.item_degree)))
+
+    def __len__(self):
+        return len(self.story_keys)
+
+    def index_of(self, story_ids):
+        """Índices internos de `story_ids` (se ignoran los que no tienen favoritos)."""
+        story_ids = np.asarray(sorted(story_ids), dtype=np.int64)
+        if not len(self.story_keys):
+            return story_ids[:0]
+        positions = np.minimum(np.searchsorted(self.story_keys, story_ids), len(self.story_keys) - 1)
+        return positions[self.story_keys[positions] == story_ids]
+
+    def items_of_users(self, users):
+        return _gather(self.user_items, self.user_ptr, users)
+
+    def neighbors(self, item, top_k, min_common=1):
+        """(índices, puntuaciones) de las top_k historias más parecidas a `item`."""
+        readers = self.item_users[self.item_ptr[item]:self.item_ptr[item + 1]]
+        candidates = self.items_of_users(readers)
+        if not len(candidates):
+            return candidates, np.zeros(0)
+
+        others, common = np.unique(candidates, return_counts=True)
+        keep = (others != item) & (common >= min_common)
+        others, common = others[keep], common[keep]
+        if not len(others):
+            return others, np.zeros(0)
+
+        scores = common / np.sqrt(float(self.item_degree[item]) * self.item_degree[others])
+
+        if len(others) > top_k:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+            others, scores = others[best], scores[best]
+        # Empates: primero la más popular, luego la de id menor (estable)
+        order = np.lexsort((others, -self.item_degree[others], -scores))
+        return others[order], scores[order]
+
+
+def _gather(values, ptr, rows):
+    """Concatena values[ptr[r]:ptr[r+1]] para cada r de `rows`, sin bucles."""
+    starts = ptr[rows]
+    lengths = ptr[rows + 1] - starts
+    total = int(lengths.sum())
+    if not total:
+        return values[:0]
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return values[offsets + np.arange(total)]
+
+
+def compute_neighbors(matrix, items, top_k, min_common=1):
+    """Genera (item, [(vecina, puntuación), ...]) para cada índice de `items`."""
+    for item in items:
+        others, scores = matrix.neighbors(int(item), top_k, min_common)
+        yield int(item), list(zip(others.tolist(), scores.tolist()))
+
+
+# ---------------------------
+#   Cálculo desde la base de datos
+# ---------------------------
+def load_matrix():
+    # Solo historias publicadas: los borradores ni se recomiendan ni reciben vecinas
+    favorites = Favorite.objects.filter(story__status="published").order_by().values_list("user_id", "story_id")
+    pairs = np.fromiter(
+        (value for pair in favorites.iterator(chunk_size=10000) for value in pair),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    return FavoriteMatrix(
+        pairs[:, 0], pairs[:, 1],
+        max_user_favorites=_setting("RECOMMENDATIONS_MAX_USER_FAVORITES", 500),
+    )
+
+
+def stale_story_ids(since):
+    """Historias cuyo vecindario cambia con los favoritos creados desde `since`."""
+    users = (
+        Favorite.objects.filter(created_at__gte=since)
+        .values_list("user_id", flat=True).distinct()
+    )
+    return set(Favorite.objects.filter(user_id__in=users).values_list("story_id", flat=True))
+
+
+def last_run():
+    return StoryNeighbor.objects.aggregate(last=Max("computed_at"))["last"]
+
+
+def compute_recommendations(full=False):
+    """
+    Recalcula StoryNeighbor. Sin `full`, solo las historias afectadas por
+    los favoritos nuevos. Devuelve cuántas historias se recalcularon.
+    """
+    now = timezone.now()
+    since = None if full else last_run()
+    matrix = load_matrix()
+
+    if since is None:
+        story_ids = None
+        items = np.arange(len(matrix))
+    else:
+        story_ids = stale_story_ids(since)
+        if not story_ids:
+            return 0
+        items = matrix.index_of(story_ids)
+
+    top_k = _setting("RECOMMENDATIONS_TOP_K", 10)
+    min_common = _setting("RECOMMENDATIONS_MIN_COMMON", 2)
+    keys = matrix.story_keys
+
+    recomputed = 0
+    for start in range(0, len(items), COMPUTE_BLOCK):
+        block = items[start:start + COMPUTE_BLOCK]
+        rows = []
+        for item, neighbors in compute_neighbors(matrix, block, top_k, min_common):
+            rows += [
+                StoryNeighbor(
+                    story_id=int(keys[item]),
+                    neighbor_id=int(keys[other]),
+                    rank=rank,
+                    score=round(score, 6),
+                    computed_at=now,
+                )
+                for rank, (other, score) in enumerate(neighbors, start=1)
+            ]
+
+        block_ids = [int(keys[item]) for item in block]
+        with transaction.atomic():
+            StoryNeighbor.objects.filter(story_id__in=block_ids).delete()
+            StoryNeighbor.objects.bulk_create(rows, batch_size=SAVE_CHUNK_SIZE)
+        recomputed += len(block)
+
+    # Historias que ya no tienen favoritos: sin vecinas
+    if story_ids is None:
+        StoryNeighbor.objects.filter(computed_at__lt=now).delete()
+    else:
+        gone = story_ids - set(keys[items].tolist())
+        StoryNeighbor.objects.filter(story_id__in=gone).delete()
+
+    return recomputed
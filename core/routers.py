@@ -0,0 +1,99 @@
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+# ===========================
+#      RÉPLICA DE LECTURA
+# ===========================
+# Si existe el alias "replica" en DATABASES, las lecturas de las vistas de
+# listado y detalle (REPLICA_VIEWS, solo GET/HEAD) van a la réplica y todo
+# lo demás al primario. Lo decide ReplicaRoutingMiddleware por petición;
+# fuera de una petición (comandos, worker, shell) siempre se usa el primario.
+#
+# Lee-lo-que-escribes: si una petición escribe, la respuesta lleva una
+# cookie que durante REPLICA_PIN_SECONDS manda las lecturas de ese
+# navegador al primario, hasta que la réplica haya recibido el cambio.
+#
+# Todo lo que se guarda en caché se calcula con primary_reads(): las
+# versiones se suben tras el commit en el primario y una réplica con
+# retraso dejaría datos viejos en caché durante todo su TTL.
+
+REPLICA_ALIAS = "replica"
+PRIMARY_ALIAS = "default"
+
+
+class RoutingState:
+    def __init__(self):
+        self.replica_reads = False
+        self.wrote = False
+
+
+_state = contextvars.ContextVar("storyverse_db_routing", default=None)
+
+
+def has_replica():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def routing(state):
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Dentro del bloque, las lecturas van al primario aunque la vista use la réplica."""
+    state = _state.get()
+    if state is None or not state.replica_reads:
+        yield
+        return
+    state.replica_reads = False
+    try:
+        yield
+    finally:
+        state.replica_reads = True
+
+
+# Modelo interno de la caché en BD (CACHE_BACKEND=database): las versiones
+# de caché se leen siempre del primario, donde se acaban de subir, y
+# escribir en ella no cuenta como escritura de la petición
+CACHE_APP_LABEL = "django_cache"
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (
+            state is not None
+            and model._meta.app_label != CACHE_APP_LABEL
+            and state.replica_reads
+            and not state.wrote
+            and has_replica()
+            # Dentro de una transacción se lee del primario: vería sus propias escrituras
+            and not connections[PRIMARY_ALIAS].in_atomic_block
+        ):
+            return REPLICA_ALIAS
+        return PRIMARY_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        # Guardar en la caché (deduplicar visitas, versiones, páginas) no es
+        # un cambio de datos: no fija al navegador al primario
+        if state is not None and model._meta.app_label != CACHE_APP_LABEL:
+            state.wrote = True
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y réplica tienen los mismos datos
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplica recibe el esquema por replicación, no por migraciones
+        return db != REPLICA_ALIAS
@@ -0,0 +1,155 @@
+import re
+
+from django.db import connection
+
+
+# ===========================
+#      BÚSQUEDA DE TEXTO COMPLETO
+# ===========================
+# Índice de historias publicadas (título, descripción, categoría y episodios):
+#   - SQLite: tabla virtual FTS5 "core_story_fts" (rowid = id de la historia)
+#   - PostgreSQL: tabla "core_story_fts" con una columna tsvector + índice GIN
+# Ambas se crean en la migración 0014 y se mantienen al día desde core.signals.
+# Con cualquier otro motor se usa icontains como último recurso.
+
+SEARCH_TABLE = "core_story_fts"
+SEARCH_CONFIG = "spanish"
+
+# Pesos por columna para bm25 (título, descripción, categoría, episodios)
+SQLITE_WEIGHTS = (10.0, 4.0, 2.0, 1.0)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def backend():
+    return connection.vendor if connection.vendor in ("sqlite", "postgresql") else None
+
+
+def tokenize(query):
+    return _TOKEN_RE.findall(query.lower())[:8]
+
+
+def _sqlite_match(tokens):
+    # Cada palabra se busca por prefijo: "dra" encuentra "dragón"
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _postgres_match(tokens):
+    return " & ".join(f"{token}:*" for token in tokens)
+
+
+# ---------------------------
+#   Consulta
+# ---------------------------
+def search_story_ids(query, limit=20, offset=0):
+    """
+    Devuelve los ids de las historias que coinciden con `query`, ordenados
+    por relevancia. Devuelve None si el motor no tiene índice de texto.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    vendor = backend()
+
+    if vendor == "sqlite":
+        weights = ", ".join(str(weight) for weight in SQLITE_WEIGHTS)
+        sql = (
+            f"SELECT rowid FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH %s "
+            f"ORDER BY bm25({SEARCH_TABLE}, {weights}) "
+            f"LIMIT %s OFFSET %s"
+        )
+        params = [_sqlite_match(tokens), limit, offset]
+
+    elif vendor == "postgresql":
+        sql = (
+            f"SELECT story_id FROM {SEARCH_TABLE} "
+            f"WHERE document @@ to_tsquery('{SEARCH_CONFIG}', %s) "
+            f"ORDER BY ts_rank(document, to_tsquery('{SEARCH_CONFIG}', %s)) DESC, story_id DESC "
+            f"LIMIT %s OFFSET %s"
+        )
+        match = _postgres_match(tokens)
+        params = [match, match, limit, offset]
+
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+# ---------------------------
+#   Indexación
+# ---------------------------
+def _story_document(story_id):
+    from .models import Episode, Story
+
+    story = (
+        Story.published.select_related("category")
+        .only("id", "title", "description", "category__name")
+        .filter(id=story_id)
+        .first()
+    )
+    if story is None:
+        return None
+
+    episodes = Episode.objects.filter(story_id=story_id).values_list("title", "content")
+    return {
+        "title": story.title,
+        "description": story.description,
+        "category": story.category.name if story.category else "",
+        "episodes": "\n".join(f"{title}\n{content}" for title, content in episodes),
+    }
+
+
+def index_story(story_id):
+    """(Re)indexa una historia; si ya no existe o no está publicada, la quita del índice."""
+    vendor = backend()
+    if vendor is None:
+        return
+
+    doc = _story_document(story_id)
+
+    with connection.cursor() as cursor:
+        if vendor == "sqlite":
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [story_id])
+            if doc is not None:
+                cursor.execute(
+                    f"INSERT INTO {SEARCH_TABLE} (rowid, title, description, category, episodes) "
+                    f"VALUES (%s, %s, %s, %s, %s)",
+                    [story_id, doc["title"], doc["description"], doc["category"], doc["episodes"]],
+                )
+
+        else:
+            if doc is None:
+                cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE story_id = %s", [story_id])
+                return
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (story_id, document) VALUES (%s, "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', %s), 'A') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', %s), 'B') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', %s), 'C') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', %s), 'D')) "
+                f"ON CONFLICT (story_id) DO UPDATE SET document = EXCLUDED.document",
+                [story_id, doc["title"], doc["description"], doc["category"], doc["episodes"]],
+            )
+
+
+def rebuild_index():
+    """Vacía el índice y lo reconstruye con todas las historias publicadas."""
+    from .models import Story
+
+    vendor = backend()
+    if vendor is None:
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+    total = 0
+    for story_id in Story.published.values_list("id", flat=True).iterator(chunk_size=500):
+        index_story(story_id)
+        total += 1
+    return total
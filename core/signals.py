@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.db import transaction
+from django.db.models import F
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import Profile
+from .cache import bump_version
+from . import autocomplete, episode_cache, feed, navigation, page_cache, search, story_stats
+from .models import Category, Comment, Episode, Favorite, Follow, Profile, Story, StoryStats
 
 
 @receiver(post_save, sender=User)
@@ -10,6 +14,213 @@ def create_profile(sender, instance, created, **kwargs):
         Profile.objects.create(user=instance)
 
 
+# ===========================
+#      INVALIDACIÓN DE CACHÉ
+# ===========================
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_categories_nav(sender, **kwargs):
+    bump_version("categories_nav")
+
+
+@receiver([post_save, post_delete], sender=Favorite)
+def invalidate_favorite_ids(sender, instance, **kwargs):
+    # Tras el commit, para que ninguna petición cachee el estado anterior
+    name = f"favorites:{instance.user_id}"
+    transaction.on_commit(lambda: bump_version(name))
+
+
+# ===========================
+#      ÍNDICE DE BÚSQUEDA
+# ===========================
+def _reindex_on_commit(story_id):
+    transaction.on_commit(lambda: search.index_story(story_id))
+
+
+@receiver([post_save, post_delete], sender=Story)
+def reindex_story(sender, instance, **kwargs):
+    _reindex_on_commit(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Episode)
+def reindex_episode_story(sender, instance, **kwargs):
+    _reindex_on_commit(instance.story_id)
+
+
+@receiver([post_save, pre_delete], sender=Category)
+def reindex_category_stories(sender, instance, created=False, **kwargs):
+    # pre_delete: las historias aún apuntan a la categoría que se va a borrar
+    if created:
+        return
+    for story_id in Story.objects.filter(category=instance).values_list("id", flat=True):
+        _reindex_on_commit(story_id)
+
+
+# ===========================
+#      AUTOCOMPLETADO
+# ===========================
+@receiver(post_save, sender=Story)
+def autocomplete_story_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {"title", "slug", "status"} & set(update_fields):
+        return
+    story_id, title, slug = instance.id, instance.title, instance.slug
+    if instance.status != "published":
+        # Un borrador no se sugiere (si antes estaba publicado, sale del índice)
+        transaction.on_commit(lambda: autocomplete.changed("story", story_id))
+        return
+    transaction.on_commit(lambda: autocomplete.changed("story", story_id, title, slug))
+
+
+@receiver(post_delete, sender=Story)
+def autocomplete_story_deleted(sender, instance, **kwargs):
+    story_id = instance.id
+    transaction.on_commit(lambda: autocomplete.changed("story", story_id))
+
+
 @receiver(post_save, sender=User)
-def save_profile(sender, instance, **kwargs):
-    instance.profile.save()
+def autocomplete_user_saved(sender, instance, update_fields=None, **kwargs):
+    # Ignora guardados parciales como el last_login de cada inicio de sesión
+    if update_fields and "username" not in update_fields:
+        return
+    user_id, username = instance.id, instance.username
+    transaction.on_commit(lambda: autocomplete.changed("user", user_id, username, username))
+
+
+@receiver(post_delete, sender=User)
+def autocomplete_user_deleted(sender, instance, **kwargs):
+    user_id = instance.id
+    transaction.on_commit(lambda: autocomplete.changed("user", user_id))
+
+
+# ===========================
+#      HTML CACHEADO DE EPISODIOS
+# ===========================
+@receiver(pre_save, sender=Episode)
+def remember_content_hash(sender, instance, **kwargs):
+    # Hash y palabras anteriores: caché de HTML y StoryStats
+    instance._old_content_hash = None
+    instance._old_word_count = None
+    if instance.pk:
+        instance._old_content_hash, instance._old_word_count = (
+            Episode.objects.filter(pk=instance.pk).values_list("content_hash", "word_count").first()
+            or (None, None)
+        )
+
+
+@receiver(post_save, sender=Episode)
+def invalidate_episode_html(sender, instance, **kwargs):
+    old_hash = getattr(instance, "_old_content_hash", None)
+    if old_hash and old_hash != instance.content_hash:
+        episode_cache.invalidate(instance.id, old_hash)
+
+
+@receiver(post_delete, sender=Episode)
+def delete_episode_html(sender, instance, **kwargs):
+    episode_cache.invalidate(instance.id, instance.content_hash)
+
+
+# ===========================
+#      CACHÉ DE PÁGINAS ANÓNIMAS
+# ===========================
+def _story_slug(**filters):
+    return Story.objects.filter(**filters).values_list("slug", flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=Story)
+def purge_story_pages(sender, instance, **kwargs):
+    page_cache.purge(page_cache.LISTS_SCOPE, page_cache.story_scope(instance.slug))
+
+
+@receiver([post_save, post_delete], sender=Episode)
+def purge_episode_pages(sender, instance, **kwargs):
+    slug = _story_slug(id=instance.story_id)
+    if slug:
+        page_cache.purge(page_cache.story_scope(slug))
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs):
+    slug = _story_slug(episodes__id=instance.episode_id)
+    if slug:
+        page_cache.purge(page_cache.story_scope(slug))
+
+
+@receiver([post_save, post_delete], sender=Category)
+def purge_category_pages(sender, instance, **kwargs):
+    page_cache.purge(page_cache.LISTS_SCOPE)
+
+
+# ===========================
+#      ÍNDICE DE NAVEGACIÓN
+# ===========================
+@receiver([post_save, post_delete], sender=Episode)
+def invalidate_episode_navigation(sender, instance, **kwargs):
+    story_id = instance.story_id
+    transaction.on_commit(lambda: navigation.invalidate_episodes(story_id))
+
+
+# ===========================
+#      ESTADÍSTICAS POR HISTORIA
+# ===========================
+# En la misma transacción que el cambio, como los contadores de seguidores.
+# Favoritos y visitas ya se cuentan en Story: aquí solo marcan actividad.
+@receiver(post_save, sender=Story)
+def create_story_stats(sender, instance, created, **kwargs):
+    if created:
+        StoryStats.objects.get_or_create(story=instance, defaults={"last_activity": instance.created_at})
+
+
+@receiver(post_save, sender=Episode)
+def episode_stats_saved(sender, instance, created, **kwargs):
+    filters = {"story_id": instance.story_id}
+    if created:
+        story_stats.apply(filters, at=instance.created_at, episodes=1, words=instance.word_count)
+        return
+    old_words = getattr(instance, "_old_word_count", None)
+    if old_words is not None and old_words != instance.word_count:
+        story_stats.apply(filters, words=instance.word_count - old_words)
+
+
+@receiver(post_delete, sender=Episode)
+def episode_stats_deleted(sender, instance, **kwargs):
+    story_stats.apply({"story_id": instance.story_id}, episodes=-1, words=-instance.word_count)
+
+
+@receiver(post_save, sender=Comment)
+def comment_stats_saved(sender, instance, created, **kwargs):
+    if created:
+        story_stats.apply({"story__episodes__id": instance.episode_id}, at=instance.created_at, comments=1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_stats_deleted(sender, instance, **kwargs):
+    story_stats.apply({"story__episodes__id": instance.episode_id}, comments=-1)
+
+
+@receiver(post_save, sender=Favorite)
+def favorite_stats_saved(sender, instance, created, **kwargs):
+    if created:
+        story_stats.apply({"story_id": instance.story_id}, at=instance.created_at)
+
+
+# ===========================
+#      CONTADORES DE SEGUIDORES
+# ===========================
+# Se actualizan en la misma transacción que el Follow, tanto desde
+# toggle_follow como en los borrados en cascada (p. ej. al eliminar un usuario).
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if not created:
+        return
+    Profile.objects.filter(user_id=instance.following_id).update(followers_count=F("followers_count") + 1)
+    Profile.objects.filter(user_id=instance.follower_id).update(following_count=F("following_count") + 1)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    Profile.objects.filter(user_id=instance.following_id, followers_count__gt=0).update(
+        followers_count=F("followers_count") - 1
+    )
+    Profile.objects.filter(user_id=instance.follower_id, following_count__gt=0).update(
+        following_count=F("following_count") - 1
+    )
+    feed.forget_author(instance.follower_id, instance.following_id)
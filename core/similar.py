@@ -0,0 +1,20 @@
+from .models import StoryNeighbor
+
+
+# ===========================
+#      HISTORIAS SIMILARES
+# ===========================
+# Lectura de las vecinas que calcula core.recommendations. Va aparte para
+# que las vistas no importen NumPy en cada proceso web.
+
+
+def similar_stories(story_id, limit=6):
+    """Vecinas precalculadas de la historia: una consulta por índice."""
+    return [
+        link.neighbor
+        # Una vecina puede haber vuelto a borrador desde la última pasada
+        for link in StoryNeighbor.objects.filter(story_id=story_id, rank__lte=limit, neighbor__status="published")
+        .select_related("neighbor")
+        .only("neighbor__id", "neighbor__slug", "neighbor__title", "neighbor__cover_image", "neighbor__cover_hash",
+              "neighbor__cover_width")
+    ]
@@ -0,0 +1,158 @@
+from django.db import transaction
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Comment, Episode, Favorite, Story, StoryStats
+
+
+# ===========================
+#      ESTADÍSTICAS POR HISTORIA
+# ===========================
+# StoryStats guarda por historia episodios, palabras, comentarios y la
+# última actividad. Las señales (core.signals) y el contador de visitas
+# aplican cada cambio con un UPDATE ... F() en la misma transacción que lo
+# provoca, así el panel del autor es una sola consulta sin agregados.
+#
+# La migración 0025 crea las filas de las historias existentes. Lo que se
+# crea con bulk_create (generate_data, import_stories) no emite
+# señales: ahí se llama a rebuild(). `manage.py rebuild_story_stats`
+# recalcula todo desde las tablas, por bloques de historias.
+
+REBUILD_CHUNK_SIZE = 1000
+WORDS_CHUNK_SIZE = 500
+
+
+# ---------------------------
+#   Cambios incrementales
+# ---------------------------
+def apply(filters, at=None, **deltas):
+    """
+    Suma los deltas (episodes=1, words=-120...) a las filas que cumplen
+    `filters` ({"story_id": ...}). Nunca baja de 0. Con `at`, también
+    actualiza la última actividad.
+    """
+    changes = {
+        field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items() if delta
+    }
+    if at is not None:
+        changes["last_activity"] = at
+    if changes:
+        StoryStats.objects.filter(**filters).update(**changes)
+
+
+def touch(story_ids, at=None):
+    """Marca actividad (p. ej. un lote de visitas) sin cambiar contadores."""
+    StoryStats.objects.filter(story_id__in=story_ids).update(last_activity=at or timezone.now())
+
+
+# ---------------------------
+#   Reconstrucción
+# ---------------------------
+def _by_story(queryset, story_field, **aggregates):
+    return {
+        row.pop(story_field): row
+        for row in queryset.order_by().values(story_field).annotate(**aggregates)
+    }
+
+
+def _rebuild_chunk(stories):
+    story_ids = [story_id for story_id, _ in stories]
+    episodes = _by_story(
+        Episode.objects.filter(story_id__in=story_ids), "story_id",
+        total=Count("id"), words=Sum("word_count"), last=Max("created_at"),
+    )
+    comments = _by_story(
+        Comment.objects.filter(episode__story_id__in=story_ids), "episode__story_id",
+        total=Count("id"), last=Max("created_at"),
+    )
+    favorites = _by_story(
+        Favorite.objects.filter(story_id__in=story_ids), "story_id", last=Max("created_at"),
+    )
+
+    rows = []
+    for story_id, created_at in stories:
+        episode = episodes.get(story_id, {})
+        comment = comments.get(story_id, {})
+        activity = [
+            created_at, episode.get("last"), comment.get("last"),
+            favorites.get(story_id, {}).get("last"),
+        ]
+        rows.append(StoryStats(
+            story_id=story_id,
+            episodes=episode.get("total", 0),
+            words=episode.get("words") or 0,
+            comments=comment.get("total", 0),
+            last_activity=max(moment for moment in activity if moment is not None),
+        ))
+
+    StoryStats.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["story"],
+        update_fields=["episodes", "words", "comments", "last_activity"],
+    )
+    return len(rows)
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def rebuild(story_ids=None, chunk_size=REBUILD_CHUNK_SIZE):
+    """
+    Recalcula StoryStats desde las tablas, por bloques de historias (todas
+    o solo `story_ids`). Devuelve cuántas historias.
+    """
+    stories = Story.objects.order_by("id").values_list("id", "created_at")
+    if story_ids is None:
+        chunks = _chunks(stories.iterator(chunk_size=chunk_size), chunk_size)
+    else:
+        # Por bloques también los ids: sin listas IN enormes
+        chunks = (
+            list(stories.filter(id__in=ids))
+            for ids in _chunks(sorted(story_ids), chunk_size)
+        )
+
+    total = 0
+    for chunk in chunks:
+        with transaction.atomic():
+            total += _rebuild_chunk(chunk)
+    return total
+
+
+def recount_words(chunk_size=WORDS_CHUNK_SIZE):
+    """Recalcula Episode.word_count leyendo el contenido por bloques."""
+    total = 0
+    episodes = Episode.objects.only("id", "content").order_by("id")
+    for batch in _chunks(episodes.iterator(chunk_size=chunk_size), chunk_size):
+        for episode in batch:
+            episode.word_count = Episode.count_words(episode.content)
+        Episode.objects.bulk_update(batch, ["word_count"])
+        total += len(batch)
+    return total
+
+
+# ---------------------------
+#   Lectura
+# ---------------------------
+def author_stories(user):
+    """Historias del autor con categoría y estadísticas: una consulta."""
+    return (
+        Story.objects.filter(author=user)
+        .select_related("category", "stats")
+        .only(
+            "id", "title", "slug", "status", "cover_image", "cover_hash", "cover_width", "views",
+            "favorites_count", "created_at", "category__name",
+            "stats__episodes", "stats__words", "stats__comments", "stats__last_activity",
+        )
+        .order_by("-created_at")
+    )
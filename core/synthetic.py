@@ -0,0 +1,229 @@
+import random
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from . import rankings, recommendations, search, story_stats
+from .models import Category, Comment, Episode, Favorite, Follow, Profile, Story
+
+
+# ===========================
+#      DATOS SINTÉTICOS
+# ===========================
+# Genera un catálogo realista para pruebas de carga: popularidad desigual
+# (unos pocos autores e historias concentran casi todo), fechas repartidas
+# en los últimos meses y contadores desnormalizados coherentes. Todo con
+# bulk_create por lotes, sin pasar por señales.
+
+BATCH_SIZE = 1000
+PASSWORD = "storyverse"
+
+CATEGORIES = ("Fantasía", "Ciencia ficción", "Romance", "Terror", "Misterio", "Aventura", "Drama", "Humor")
+
+WORDS = (
+    "dragón luz sombra reino viaje ciudad mar bosque noche estrella fuego "
+    "secreto camino memoria tormenta castillo espejo invierno lobo carta "
+    "silencio puerta río montaña promesa eco isla viento ruinas sueño"
+).split()
+
+SIZES = {
+    "users": 200,
+    "stories": 100,
+    "episodes_per_story": 8,
+    "comments": 2000,
+    "favorites": 2000,
+    "follows": 1000,
+}
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _paragraphs(rng, count):
+    return "\n\n".join(_sentence(rng, rng.randint(40, 90)) + "." for _ in range(count))
+
+
+def _skewed(rng, population, k):
+    """k elementos con popularidad tipo Zipf (los primeros salen mucho más)."""
+    weights = [1.0 / (rank + 1) ** 0.9 for rank in range(len(population))]
+    return rng.choices(population, weights=weights, k=k)
+
+
+def _unique_pairs(rng, left, right, count, right_picker):
+    pairs = set()
+    attempts = 0
+    while len(pairs) < count and attempts < count * 5:
+        attempts += 1
+        a, b = rng.choice(left), right_picker()
+        if a != b:
+            pairs.add((a, b))
+    return sorted(pairs)
+
+
+def _spread_dates(objects, rng, since, now):
+    for obj in objects:
+        obj.created_at = since + (now - since) * rng.random()
+
+
+def generate(scale=1, seed=42, prefix="sv", stdout=None):
+    """
+    Crea SIZES × scale filas de cada tipo. `prefix` distingue los nombres
+    de usuario y slugs, así se puede generar varias veces en la misma base.
+    Devuelve un dict con lo creado.
+    """
+    rng = random.Random(seed)
+    sizes = {name: max(1, int(value * scale)) for name, value in SIZES.items()}
+    sizes["episodes_per_story"] = SIZES["episodes_per_story"]
+    now = timezone.now()
+    since = now - timedelta(days=180)
+
+    def log(message):
+        if stdout is not None:
+            stdout.write(message)
+
+    with transaction.atomic():
+        categories = [Category.objects.get_or_create(name=name)[0] for name in CATEGORIES]
+
+        # Usuarios: la contraseña se cifra una sola vez (es lo caro)
+        password = make_password(PASSWORD)
+        users = User.objects.bulk_create(
+            [
+                User(username=f"{prefix}_user{i}", email=f"{prefix}_user{i}@example.com", password=password)
+                for i in range(sizes["users"])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        Profile.objects.bulk_create([Profile(user=user) for user in users], batch_size=BATCH_SIZE)
+        log(f"{len(users)} usuarios")
+
+        # Historias: pocos autores escriben mucho
+        authors = users[: max(1, len(users) // 5)]
+        stories = [
+            Story(
+                title=_sentence(rng, rng.randint(2, 5)),
+                slug=f"{prefix}-story-{i}",
+                description=_paragraphs(rng, 1),
+                author=author,
+                category=rng.choice(categories),
+                status="published" if rng.random() < 0.85 else "draft",
+            )
+            for i, author in enumerate(_skewed(rng, authors, sizes["stories"]))
+        ]
+        Story.objects.bulk_create(stories, batch_size=BATCH_SIZE)
+        _spread_dates(stories, rng, since, now)
+        Story.objects.bulk_update(stories, ["created_at"], batch_size=BATCH_SIZE)
+        log(f"{len(stories)} historias")
+
+        episodes = []
+        for story in stories:
+            for number in range(1, rng.randint(1, sizes["episodes_per_story"] * 2) + 1):
+                content = _paragraphs(rng, rng.randint(3, 8))
+                episodes.append(Episode(
+                    story=story,
+                    number=number,
+                    title=_sentence(rng, rng.randint(2, 4)),
+                    content=content,
+                    content_hash=Episode.hash_content(content),
+                    word_count=Episode.count_words(content),
+                ))
+        Episode.objects.bulk_create(episodes, batch_size=BATCH_SIZE)
+        for episode in episodes:
+            episode.created_at = episode.story.created_at + (now - episode.story.created_at) * rng.random()
+        Episode.objects.bulk_update(episodes, ["created_at"], batch_size=BATCH_SIZE)
+        log(f"{len(episodes)} episodios")
+
+        comments = [
+            Comment(episode=episode, user=rng.choice(users), text=_sentence(rng, rng.randint(5, 30)))
+            for episode in _skewed(rng, episodes, sizes["comments"])
+        ]
+        Comment.objects.bulk_create(comments, batch_size=BATCH_SIZE)
+        for comment in comments:
+            comment.created_at = comment.episode.created_at + (now - comment.episode.created_at) * rng.random()
+        Comment.objects.bulk_update(comments, ["created_at"], batch_size=BATCH_SIZE)
+        log(f"{len(comments)} comentarios")
+
+        story_ids = [story.id for story in stories]
+        favorite_pairs = _unique_pairs(
+            rng, [user.id for user in users], story_ids, sizes["favorites"],
+            lambda: _skewed(rng, story_ids, 1)[0],
+        )
+        Favorite.objects.bulk_create(
+            [Favorite(user_id=user_id, story_id=story_id) for user_id, story_id in favorite_pairs],
+            batch_size=BATCH_SIZE,
+        )
+        log(f"{len(favorite_pairs)} favoritos")
+
+        user_ids = [user.id for user in users]
+        author_ids = [author.id for author in authors]
+        follow_pairs = _unique_pairs(
+            rng, user_ids, author_ids, sizes["follows"],
+            lambda: _skewed(rng, author_ids, 1)[0],
+        )
+        Follow.objects.bulk_create(
+            [Follow(follower_id=follower, following_id=following) for follower, following in follow_pairs],
+            batch_size=BATCH_SIZE,
+        )
+        log(f"{len(follow_pairs)} seguimientos")
+
+        # Contadores desnormalizados, coherentes con lo creado
+        favorites = Counter(story_id for _, story_id in favorite_pairs)
+        for story in stories:
+            story.favorites_count = favorites[story.id]
+            story.views = favorites[story.id] * rng.randint(5, 40) + rng.randint(0, 50)
+        Story.objects.bulk_update(stories, ["favorites_count", "views"], batch_size=BATCH_SIZE)
+
+        followers = Counter(following for _, following in follow_pairs)
+        following = Counter(follower for follower, _ in follow_pairs)
+        profiles = list(Profile.objects.filter(user__in=users).only("id", "user_id"))
+        for profile in profiles:
+            profile.followers_count = followers[profile.user_id]
+            profile.following_count = following[profile.user_id]
+        Profile.objects.bulk_update(profiles, ["followers_count", "following_count"], batch_size=BATCH_SIZE)
+
+    # bulk_create no emite señales: índice y tablas derivadas se rehacen aparte
+    search.rebuild_index()
+    rankings.compute_rankings()
+    recommendations.compute_recommendations(full=True)
+    story_stats.rebuild()
+
+    return {
+        "users": len(users),
+        "stories": len(stories),
+        "episodes": len(episodes),
+        "comments": len(comments),
+        "favorites": len(favorite_pairs),
+        "follows": len(follow_pairs),
+    }
+
+
+@contextmanager
+def test_database():
+    """
+    Base de datos de prueba nueva mientras dure el bloque (en SQLite, en
+    memoria). Los alias espejo, como la réplica, apuntan a ella igual que
+    en los tests.
+    """
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+    mirrors = {}
+    for alias in connections:
+        mirror = connections[alias].settings_dict.get("TEST", {}).get("MIRROR")
+        if mirror:
+            mirrors[alias] = connections[alias].settings_dict["NAME"]
+            connections[alias].close()
+            connections[alias].creation.set_as_test_mirror(connections[mirror].settings_dict)
+
+    try:
+        yield
+    finally:
+        for alias, name in mirrors.items():
+            connections[alias].close()
+            connections[alias].settings_dict["NAME"] = name
+        connection.creation.destroy_test_db(old_name, verbosity=0)
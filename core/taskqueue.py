@@ -0,0 +1,194 @@
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import Task
+
+
+logger = logging.getLogger(__name__)
+
+
+# ===========================
+#      COLA DE TAREAS
+# ===========================
+# Cola sencilla guardada en la base de datos (modelo Task), sin broker
+# externo. Las vistas encolan con `mi_tarea.delay(...)` y el comando
+# `manage.py run_worker` las ejecuta en un ThreadPoolExecutor, reintentando
+# con espera exponencial las que fallan.
+#
+# Las tareas terminadas se borran pasado un tiempo (TASKS_KEEP_DONE y
+# TASKS_KEEP_FAILED): el worker lo hace periódicamente con purge_finished.
+#
+# Con @task(atomic=True) la tarea y su paso a "done" van en una misma
+# transacción: si el estado no llega a guardarse, lo que hizo la tarea
+# tampoco, y repetirla no cuenta nada dos veces (p. ej. las visitas).
+#
+# Con TASKS_ALWAYS_EAGER = True las tareas se ejecutan en el momento, sin
+# pasar por la cola (útil en desarrollo).
+
+_registry = {}
+
+PURGE_CHUNK_SIZE = 1000
+
+
+def task(func=None, *, name=None, max_attempts=5, atomic=False):
+    def decorator(func):
+        task_name = name or func.__name__
+        _registry[task_name] = func
+        func.task_name = task_name
+        func.atomic = atomic
+        # Los argumentos de la tarea van en un dict aparte: una tarea puede
+        # tener argumentos llamados `delay` o `max_attempts`
+        func.delay = lambda **kwargs: enqueue(task_name, kwargs, max_attempts=max_attempts)
+        return func
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def enqueue(task_name, kwargs=None, max_attempts=5, delay=0):
+    """Encola `task_name` con los argumentos `kwargs` (un dict serializable en JSON)."""
+    kwargs = kwargs or {}
+    if task_name not in _registry:
+        raise KeyError(f"Tarea desconocida: {task_name}")
+
+    if getattr(settings, "TASKS_ALWAYS_EAGER", False):
+        _registry[task_name](**kwargs)
+        return None
+
+    # Se crea dentro de la transacción actual: si se deshace, la tarea también
+    return Task.objects.create(
+        name=task_name,
+        payload=kwargs,
+        max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def backoff_seconds(attempts):
+    base = getattr(settings, "TASKS_RETRY_BASE_DELAY", 10)
+    maximum = getattr(settings, "TASKS_RETRY_MAX_DELAY", 60 * 60)
+    return min(base * 2 ** (attempts - 1), maximum)
+
+
+# ---------------------------
+#   Worker
+# ---------------------------
+def release_stale(stale_after):
+    """Devuelve a la cola las tareas de un worker que murió a medias."""
+    limit = timezone.now() - timedelta(seconds=stale_after)
+    return Task.objects.filter(status="running", locked_at__lt=limit).update(
+        status="pending", locked_at=None
+    )
+
+
+def purge_finished(chunk_size=PURGE_CHUNK_SIZE):
+    """
+    Borra las tareas completadas y las fallidas definitivamente más
+    antiguas que su retención. Por bloques: nunca un DELETE enorme que
+    bloquee la tabla a los demás. Devuelve cuántas se borraron.
+    """
+    now = timezone.now()
+    retention = {
+        "done": getattr(settings, "TASKS_KEEP_DONE", 24 * 60 * 60),
+        "failed": getattr(settings, "TASKS_KEEP_FAILED", 7 * 24 * 60 * 60),
+    }
+
+    total = 0
+    for status, seconds in retention.items():
+        expired = Task.objects.filter(status=status, finished_at__lt=now - timedelta(seconds=seconds))
+        while True:
+            ids = list(expired.values_list("id", flat=True)[:chunk_size])
+            if not ids:
+                break
+            total += Task.objects.filter(id__in=ids).delete()[0]
+    return total
+
+
+def claim(limit):
+    """
+    Reserva hasta `limit` tareas pendientes. El UPDATE condicionado al
+    estado garantiza que dos workers no se lleven la misma tarea.
+    """
+    now = timezone.now()
+    candidates = (
+        Task.objects.filter(status="pending", run_at__lte=now)
+        .order_by("run_at", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+
+    claimed = []
+    for task_id in list(candidates):
+        if Task.objects.filter(id=task_id, status="pending").update(status="running", locked_at=now):
+            claimed.append(task_id)
+    return claimed
+
+
+def run_task(task_id):
+    task_obj = Task.objects.get(id=task_id)
+    func = _registry.get(task_obj.name)
+    task_obj.attempts += 1
+
+    try:
+        if func is None:
+            raise KeyError(f"Tarea desconocida: {task_obj.name}")
+        with transaction.atomic() if func.atomic else nullcontext():
+            func(**task_obj.payload)
+            task_obj.status = "done"
+            task_obj.finished_at = timezone.now()
+            task_obj.locked_at = None
+            task_obj.save(update_fields=["attempts", "status", "finished_at", "locked_at"])
+
+    except Exception:
+        task_obj.last_error = traceback.format_exc()
+        task_obj.locked_at = None
+
+        if task_obj.attempts >= task_obj.max_attempts:
+            task_obj.status = "failed"
+            task_obj.finished_at = timezone.now()
+            logger.error("Tarea %s (%s) fallida definitivamente", task_obj.id, task_obj.name)
+        else:
+            task_obj.status = "pending"
+            task_obj.finished_at = None
+            task_obj.run_at = timezone.now() + timedelta(seconds=backoff_seconds(task_obj.attempts))
+            logger.warning("Tarea %s (%s) fallida, se reintentará", task_obj.id, task_obj.name)
+
+        task_obj.save(update_fields=["attempts", "status", "run_at", "locked_at", "finished_at", "last_error"])
+        return False
+
+    return True
+
+
+def _run_in_thread(task_id):
+    try:
+        return run_task(task_id)
+    except Exception:
+        # Un error fuera de la tarea (p. ej. "database is locked" al leer o
+        # guardar su estado) no debe tumbar el worker: la tarea sigue "en
+        # curso" y release_stale la devuelve a la cola
+        logger.exception("No se pudo ejecutar la tarea %s", task_id)
+        return False
+    finally:
+        # Cada hilo tiene su propia conexión: la cerramos al terminar
+        connection.close()
+
+
+def process_batch(executor, batch_size):
+    """Ejecuta un lote de tareas en el pool. Devuelve cuántas se procesaron."""
+    close_old_connections()
+    task_ids = claim(batch_size)
+    if not task_ids:
+        return 0
+    list(executor.map(_run_in_thread, task_ids))
+    return len(task_ids)
+
+
+def make_executor(threads):
+    return ThreadPoolExecutor(max_workers=threads, thread_name_prefix="storyverse-task")
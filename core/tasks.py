@@ -0,0 +1,65 @@
+from django.contrib.auth.models import User
+from django.core.mail import send_mail
+
+from . import feed, images, rankings
+from .models import Profile, Story
+from .reading_progress import save_progress
+from .taskqueue import task
+from .view_counter import apply_view_increments
+
+
+# ===========================
+#      TAREAS
+# ===========================
+@task
+def send_verification_email(user_id, verify_url):
+    user = User.objects.get(id=user_id)
+    send_mail(
+        subject="Verifica tu correo | StoryVerse",
+        message=f"Hola, verifica tu correo aquí:\n\n{verify_url}",
+        from_email="no-reply@storyverse.com",
+        recipient_list=[user.email],
+    )
+
+
+@task
+def process_story_cover(story_id):
+    story = Story.objects.filter(id=story_id).only("id", "cover_image").first()
+    if story is not None:
+        images.process_story_cover(story)
+
+
+@task
+def process_avatar(profile_id):
+    profile = Profile.objects.filter(id=profile_id).only("id", "avatar").first()
+    if profile is not None:
+        images.process_avatar(profile)
+
+
+@task(atomic=True)
+def apply_story_views(increments):
+    # Las claves llegan como texto desde el JSON de la tarea
+    apply_view_increments({int(story_id): amount for story_id, amount in increments.items()})
+
+
+@task
+def fan_out_episode(episode_id):
+    feed.fan_out_episode(episode_id)
+
+
+@task(atomic=True)
+def save_reading_progress(entries):
+    save_progress(entries)
+
+
+@task
+def compute_rankings():
+    rankings.compute_rankings()
+
+
+@task
+def compute_recommendations(full=False):
+    # NumPy solo se carga en el worker que calcula, no en los procesos web
+    from . import recommendations
+
+    recommendations.compute_recommendations(full=full)
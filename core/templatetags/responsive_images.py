@@ -0,0 +1,59 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+from core.images import AVATAR_WIDTHS, COVER_WIDTHS, variant_url, variant_widths
+
+
+register = template.Library()
+
+# Imágenes por defecto que ya están en media/ (no en static/)
+DEFAULT_COVER = "covers/default_cover.jpg"
+DEFAULT_AVATAR = "avatars/default.png"
+
+
+def _srcset(content_hash, widths, ext):
+    return ", ".join(f"{variant_url(content_hash, width, ext)} {width}w" for width in widths)
+
+
+def _picture(field_file, content_hash, source_width, widths, sizes, fallback, css_class, alt, style):
+    if not content_hash:
+        # El valor por defecto del campo no siempre es una ruta válida
+        # ("media/avatars/default.png"): en ese caso, la imagen por defecto
+        custom = field_file and field_file.name != field_file.field.default
+        src = field_file.url if custom else default_storage.url(fallback)
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" style="{}" loading="lazy">',
+            src, css_class, alt, style,
+        )
+
+    # Descriptores reales: el original puede ser más estrecho que los anchos fijos
+    widths = variant_widths(widths, source_width)
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" class="{}" alt="{}" style="{}" loading="lazy">'
+        '</picture>',
+        _srcset(content_hash, widths, "webp"), sizes,
+        variant_url(content_hash, widths[min(1, len(widths) - 1)], "jpg"),
+        _srcset(content_hash, widths, "jpg"), sizes,
+        css_class, alt, style,
+    )
+
+
+@register.simple_tag
+def story_cover(story, css_class="card-img-top", sizes="(min-width: 992px) 33vw, (min-width: 768px) 50vw, 100vw", style=""):
+    """Portada con srcset WebP/JPEG; usa el original si aún no hay miniaturas."""
+    return _picture(
+        story.cover_image, story.cover_hash, story.cover_width, COVER_WIDTHS, sizes,
+        DEFAULT_COVER, css_class, story.title, style,
+    )
+
+
+@register.simple_tag
+def avatar(profile, css_class="", size=48, style=""):
+    """Avatar con srcset; `size` es el ancho en píxeles con el que se muestra."""
+    return _picture(
+        profile.avatar, profile.avatar_hash, profile.avatar_width, AVATAR_WIDTHS, f"{size}px",
+        DEFAULT_AVATAR, css_class, "Avatar", style,
+    )
@@ -0,0 +1,29 @@
+from contextlib import nullcontext
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from core import benchmark
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "bench-tests"}})
+class BenchmarkCacheTests(SimpleTestCase):
+    """El benchmark vacía solo su propio caché."""
+
+    def test_run_does_not_clear_the_real_cache(self):
+        cache.set("real", 1)
+
+        def run_scale(*args, **kwargs):
+            cache.set("benchmark", 1)
+            cache.clear()
+            return {}
+
+        with mock.patch.object(benchmark, "test_database", nullcontext), \
+                mock.patch.object(benchmark, "run_scale", side_effect=run_scale) as run_scale_mock, \
+                mock.patch.object(benchmark, "git_commit", return_value=None):
+            benchmark.run([1], 1)
+
+        run_scale_mock.assert_called_once()
+        self.assertEqual(cache.get("real"), 1)
+        self.assertIsNone(cache.get("benchmark"))
@@ -0,0 +1,126 @@
+import io
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from core.bundles import BundleError, Importer, check_bundle, export_records, read_records, write_records
+from core.models import Category, Episode, Story, StoryStats
+
+
+def bundle(*lines):
+    return io.StringIO("\n".join(lines) + "\n")
+
+
+class ImportExportTests(TestCase):
+    """Exportar e importar de vuelta deja las mismas historias y episodios."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("autora", password="x")
+        cls.category = Category.objects.create(name="Fantasía", slug="fantasia")
+
+    def create_story(self, slug, episodes):
+        story = Story.objects.create(
+            title=slug.title(), slug=slug, description="Descripción", author=self.author,
+            category=self.category, status="published",
+        )
+        for number in range(1, episodes + 1):
+            Episode.objects.create(story=story, number=number, title=f"Ep {number}", content="una dos tres")
+        return story
+
+    def snapshot(self):
+        return (
+            list(Story.objects.order_by("slug").values_list("slug", "title", "description", "status", "category__slug")),
+            list(Episode.objects.order_by("story__slug", "number").values_list(
+                "story__slug", "number", "title", "content", "word_count",
+            )),
+        )
+
+    def test_round_trip(self):
+        self.create_story("dragon", 3)
+        self.create_story("bosque", 1)
+        before = self.snapshot()
+
+        fp = io.StringIO()
+        count, _ = write_records(export_records(), fp)
+        self.assertEqual(count, 6)
+        Story.objects.all().delete()
+
+        fp.seek(0)
+        stats = Importer(batch_size=2).run(read_records(fp))
+
+        self.assertEqual(stats, {"stories": 2, "episodes": 4, "skipped": 0})
+        self.assertEqual(self.snapshot(), before)
+        # bulk_create no emite señales: las estadísticas se reconstruyen
+        self.assertEqual(
+            dict(StoryStats.objects.values_list("story__slug", "episodes")),
+            {"dragon": 3, "bosque": 1},
+        )
+
+    def test_existing_story_is_skipped_with_its_episodes(self):
+        self.create_story("dragon", 1)
+        fp = io.StringIO()
+        write_records(export_records(), fp)
+        fp.seek(0)
+
+        stats = Importer().run(read_records(fp))
+
+        self.assertEqual(stats, {"stories": 0, "episodes": 0, "skipped": 1})
+        self.assertEqual(Episode.objects.count(), 1)
+
+    def test_invalid_episode_numbers_report_the_line(self):
+        story = '{"type": "story", "slug": "a", "title": "A", "author": "autora"}'
+        cases = {
+            '{"type": "episode", "story": "a", "number": "2", "title": "e"}': "Línea 2",
+            '{"type": "episode", "story": "a", "number": 0, "title": "e"}': "Línea 2",
+            '{"type": "episode", "story": "a", "title": "e"}': "Línea 2",
+        }
+        for episode, message in cases.items():
+            with self.subTest(episode=episode), self.assertRaisesMessage(BundleError, message):
+                list(read_records(bundle(story, episode)))
+
+    def test_duplicate_episode_number_reports_the_line(self):
+        episode = '{"type": "episode", "story": "a", "number": 1, "title": "e"}'
+        with self.assertRaisesMessage(BundleError, "Línea 3: episodio 1 repetido"):
+            list(read_records(bundle('{"type": "story", "slug": "a", "title": "A"}', episode, episode)))
+
+    def test_command_validates_before_saving_any_batch(self):
+        # Dos lotes válidos (--batch-size 2) y el error al final
+        valid = [
+            '{"type": "story", "slug": "a", "title": "A", "author": "autora"}',
+            '{"type": "episode", "story": "a", "number": 1, "title": "e"}',
+            '{"type": "story", "slug": "b", "title": "B", "author": "autora"}',
+            '{"type": "episode", "story": "b", "number": 1, "title": "e"}',
+        ]
+        cases = {
+            "episodio repetido": '{"type": "episode", "story": "b", "number": 1, "title": "e"}',
+            "historia sin título": '{"type": "story", "slug": "c", "author": "autora"}',
+            "autor desconocido": '{"type": "story", "slug": "c", "title": "C", "author": "nadie"}',
+            "estado no válido": '{"type": "story", "slug": "c", "title": "C", "author": "autora", "status": "x"}',
+            "episodio sin historia": '{"type": "episode", "story": "z", "number": 1, "title": "e"}',
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "historias.jsonl")
+            for case, bad in cases.items():
+                with self.subTest(case=case):
+                    with open(path, "w", encoding="utf-8") as fp:
+                        fp.write("\n".join(valid + [bad]) + "\n")
+
+                    with self.assertRaisesMessage(CommandError, "Línea 5"):
+                        call_command("import_stories", path, "--batch-size", "2", stdout=io.StringIO())
+                    self.assertFalse(Story.objects.exists())
+
+    def test_authors_are_resolved_before_importing(self):
+        fp = bundle(
+            '{"type": "story", "slug": "a", "title": "A", "author": "autora"}',
+            '{"type": "story", "slug": "b", "title": "B", "author": "autora"}',
+        )
+        authors = check_bundle(read_records(fp))
+        self.assertEqual(authors, {"autora": self.author.id})
+
+        with self.assertNumQueries(0):
+            importer = Importer(authors=authors, dry_run=True)
+            self.assertEqual(importer._author_id({"author": "autora", "_line": 1}), self.author.id)
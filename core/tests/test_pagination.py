@@ -0,0 +1,124 @@
+import base64
+import json
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Episode, Story
+from core.pagination import decode_cursor, encode_cursor, keyset_paginate
+
+
+RECENT = ("-created_at", "-id")
+POPULAR = ("-favorites_count", "-id")
+
+
+def raw_cursor(value):
+    """Cursor con cualquier contenido JSON, como lo fabricaría un usuario."""
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+# json.loads lee 1e400 como inf (json.dumps no lo escribiría así)
+INFINITE_ID = base64.urlsafe_b64encode(b'["2024-01-01T00:00:00+00:00", 1e400]').decode().rstrip("=")
+
+
+class KeysetPaginationTests(TestCase):
+    """Recorrer las páginas por cursor da todas las filas una vez y en orden."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user("autora", password="x")
+        now = timezone.now()
+        for i in range(8):
+            story = Story.objects.create(
+                title=f"Historia {i}", description="-", author=author, status="published",
+                favorites_count=i % 3,
+            )
+            # Empates de fecha a propósito: los desempata el id
+            Story.objects.filter(id=story.id).update(created_at=now - timedelta(hours=i // 2))
+
+    def walk(self, ordering, per_page=3):
+        ids, cursor, pages = [], None, 0
+        while True:
+            page = keyset_paginate(Story.objects.all(), ordering, cursor=cursor, per_page=per_page)
+            ids += [story.id for story in page]
+            pages += 1
+            if not page.has_next:
+                return ids, pages
+            cursor = page.next_cursor
+
+    def test_walks_every_row_once_in_order(self):
+        for ordering in (RECENT, POPULAR):
+            with self.subTest(ordering=ordering):
+                expected = list(Story.objects.order_by(*ordering).values_list("id", flat=True))
+                ids, pages = self.walk(ordering)
+                self.assertEqual(ids, expected)
+                self.assertEqual(pages, 3)
+
+    def test_cursor_round_trip(self):
+        values = ["2024-01-01 10:00:00+00:00", 7]
+        self.assertEqual(decode_cursor(encode_cursor(values)), values)
+
+    def test_tampered_cursor_returns_first_page(self):
+        first = [story.id for story in keyset_paginate(Story.objects.all(), RECENT, per_page=3)]
+        cursors = [
+            "no-es-un-cursor",
+            "%%%",
+            raw_cursor({"created_at": "2024-01-01"}),       # no es una lista
+            raw_cursor([1]),                                 # faltan valores
+            raw_cursor(["ayer", 3]),                         # fecha no válida
+            raw_cursor([timezone.now().isoformat(), "x"]),   # id no numérico
+            raw_cursor([None, None]),
+            INFINITE_ID,
+            raw_cursor([timezone.now().isoformat(), 10 ** 30]),  # no cabe en la BD
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                page = keyset_paginate(Story.objects.all(), RECENT, cursor=cursor, per_page=3)
+                self.assertEqual([story.id for story in page], first)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "pagination-tests"}},
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    },
+)
+class StoryListCursorTests(TestCase):
+    """El listado acepta cualquier ?cursor= sin fallar."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user("autora", password="x")
+        for i in range(30):
+            Story.objects.create(title=f"Historia {i}", description="-", author=author, status="published")
+
+    def test_load_more_follows_next_cursor(self):
+        url = reverse("story_list")
+        ajax = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+
+        first = self.client.get(url, **ajax).json()
+        self.assertIsNotNone(first["next_cursor"])
+        second = self.client.get(url, {"cursor": first["next_cursor"]}, **ajax).json()
+        self.assertIsNone(second["next_cursor"])
+
+    def test_tampered_comment_cursor_is_ignored(self):
+        story = Story.published.first()
+        episode = Episode.objects.create(story=story, number=1, title="Uno", content="Texto")
+        url = reverse("episode_comments", args=[episode.id])
+        for cursor in (INFINITE_ID, "basura"):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(url, {"cursor": cursor}).status_code, 200)
+
+    def test_tampered_cursor_renders_first_page(self):
+        tampered = (
+            "basura", raw_cursor(["ayer", "x"]), raw_cursor([1, 2, 3]),
+            INFINITE_ID, raw_cursor([timezone.now().isoformat(), 10 ** 30]),
+        )
+        for cursor in tampered:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse("story_list"), {"cursor": cursor})
+                self.assertEqual(response.status_code, 200)
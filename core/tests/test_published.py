@@ -0,0 +1,72 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Category, Comment, Episode, Story
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "published-tests"}},
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    },
+)
+class DraftVisibilityTests(TestCase):
+    """Los borradores solo los ve su autor; las vistas públicas no los listan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("autora", password="x")
+        cls.reader = User.objects.create_user("lectora", password="x")
+        cls.category = Category.objects.create(name="Misterio", slug="misterio")
+        cls.draft = Story.objects.create(
+            title="Borrador secreto", description="-", author=cls.author, category=cls.category,
+        )
+        cls.published = Story.objects.create(
+            title="Publicada", description="-", author=cls.author, category=cls.category, status="published",
+        )
+        cls.episode = Episode.objects.create(story=cls.draft, number=1, title="Uno", content="Texto")
+        Comment.objects.create(episode=cls.episode, user=cls.author, text="Nota del borrador")
+
+    def draft_urls(self):
+        return [
+            reverse("story_detail", args=[self.draft.slug]),
+            reverse("episode_detail", args=[self.draft.slug, 1]),
+            reverse("episode_list", args=[self.draft.slug]),
+            reverse("episode_comments", args=[self.episode.id]),
+        ]
+
+    def test_draft_pages_are_404_for_anonymous_and_other_users(self):
+        for login in (None, self.reader):
+            if login:
+                self.client.force_login(login)
+            for url in self.draft_urls():
+                with self.subTest(url=url, user=login):
+                    self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_author_can_preview_the_draft(self):
+        self.client.force_login(self.author)
+        for url in self.draft_urls():
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_public_listings_only_show_published(self):
+        urls = [
+            reverse("home"),
+            reverse("story_list"),
+            reverse("category_detail", args=[self.category.slug]),
+            reverse("public_profile", args=[self.author.username]),
+            reverse("search_combined") + "?q=secreto",
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotContains(response, "Borrador secreto")
+
+        self.assertContains(self.client.get(reverse("story_list")), "Publicada")
+
+    def test_author_views_keep_drafts(self):
+        self.client.force_login(self.author)
+        self.assertContains(self.client.get(reverse("my_stories")), "Borrador secreto")
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.benchmark import _sample, app_routes
+from core.reading_progress import progress_buffer
+from core.synthetic import generate
+from core.view_counter import view_counter
+
+
+@override_settings(
+    QUERY_BUDGET_STRICT=True,
+    # Sin collectstatic no hay manifiesto de estáticos
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    },
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "budget-tests"}},
+)
+class QueryBudgetTests(TestCase):
+    """Cada vista de QUERY_BUDGETS, en frío y con caché, sin pasarse del presupuesto."""
+
+    @classmethod
+    def setUpTestData(cls):
+        generate(scale=0.1, prefix="qb")
+        cls.author, cls.sample = _sample("qb")
+
+    def setUp(self):
+        cache.clear()
+
+    def tearDown(self):
+        # Las visitas pendientes se vuelcan ahora, con la base de tests viva
+        view_counter.flush_safely()
+        progress_buffer.flush_safely()
+
+    def test_views_stay_within_budget(self):
+        routes = app_routes()
+        anonymous = Client()
+        logged_in = Client()
+        logged_in.force_login(self.author)
+
+        for name in settings.QUERY_BUDGETS:
+            url = reverse(name, kwargs={param: self.sample[param] for param in routes[name]})
+            for mode, client in (("anon", anonymous), ("auth", logged_in)):
+                with self.subTest(view=name, mode=mode):
+                    cache.clear()
+                    # QueryBudgetExceeded sale de la vista y falla el test
+                    for _ in range(2):
+                        response = client.get(url)
+                        self.assertIn(response.status_code, (200, 302))
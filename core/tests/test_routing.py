@@ -0,0 +1,140 @@
+import time
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import ResolverMatch
+
+from core import routers
+from core.cache import get_or_set_versioned
+from core.middleware import PIN_COOKIE, ReplicaRoutingMiddleware
+from core.models import Story
+from core.page_cache import anonymous_page_cache
+
+
+router = routers.PrimaryReplicaRouter()
+
+
+def run_view(view, method="get", url_name="story_list", cookies=None):
+    """Pasa `view` por ReplicaRoutingMiddleware como si la resolviera `url_name`."""
+    request = getattr(RequestFactory(), method)("/historias/")
+    request.resolver_match = ResolverMatch(view, (), {}, url_name=url_name)
+    request.user = AnonymousUser()
+    request.COOKIES.update(cookies or {})
+    middleware = ReplicaRoutingMiddleware(lambda req: middleware.process_view(req, view, (), {}) or view(req))
+    return middleware(request)
+
+
+def read_alias():
+    return router.db_for_read(Story)
+
+
+@override_settings(
+    REPLICA_VIEWS=("story_list",),
+    REPLICA_PIN_SECONDS=10,
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "routing-tests"}},
+)
+@mock.patch("core.routers.has_replica", return_value=True)
+@mock.patch("core.middleware.has_replica", return_value=True)
+class ReplicaRoutingTests(SimpleTestCase):
+    """Lecturas a la réplica, escrituras y lee-lo-que-escribes con la cookie."""
+
+    def run_view(self, view, method="get", url_name="story_list", cookies=None):
+        return run_view(view, method, url_name, cookies)
+
+    def recording_view(self, seen, write=False):
+        def view(request):
+            seen.append(read_alias())
+            if write:
+                router.db_for_write(Story)
+                seen.append(read_alias())
+            return HttpResponse("ok")
+        return view
+
+    def test_get_on_replica_view_reads_replica(self, *mocks):
+        seen = []
+        response = self.run_view(self.recording_view(seen))
+        self.assertEqual(seen, [routers.REPLICA_ALIAS])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_other_views_and_posts_read_primary(self, *mocks):
+        seen = []
+        self.run_view(self.recording_view(seen), url_name="my_library")
+        self.run_view(self.recording_view(seen), method="post")
+        self.assertEqual(seen, [routers.PRIMARY_ALIAS, routers.PRIMARY_ALIAS])
+
+    def test_write_switches_to_primary_and_pins_browser(self, *mocks):
+        seen = []
+        response = self.run_view(self.recording_view(seen, write=True))
+        self.assertEqual(seen, [routers.REPLICA_ALIAS, routers.PRIMARY_ALIAS])
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(response.cookies[PIN_COOKIE]["max-age"], 10)
+
+    def test_pinned_browser_reads_primary(self, *mocks):
+        seen = []
+        self.run_view(self.recording_view(seen), cookies={PIN_COOKIE: str(int(time.time()) + 5)})
+        self.assertEqual(seen, [routers.PRIMARY_ALIAS])
+
+    def test_expired_or_invalid_pin_reads_replica(self, *mocks):
+        seen = []
+        self.run_view(self.recording_view(seen), cookies={PIN_COOKIE: str(int(time.time()) - 1)})
+        self.run_view(self.recording_view(seen), cookies={PIN_COOKIE: "x"})
+        self.assertEqual(seen, [routers.REPLICA_ALIAS, routers.REPLICA_ALIAS])
+
+    def test_outside_requests_read_primary(self, *mocks):
+        self.assertEqual(read_alias(), routers.PRIMARY_ALIAS)
+
+    def test_cache_builders_read_primary(self, *mocks):
+        seen = []
+
+        def view(request):
+            seen.append(read_alias())
+            get_or_set_versioned("routing-test", (time.time(),), lambda: seen.append(read_alias()) or 1)
+            seen.append(read_alias())
+            return HttpResponse("ok")
+
+        self.run_view(view)
+        self.assertEqual(seen, [routers.REPLICA_ALIAS, routers.PRIMARY_ALIAS, routers.REPLICA_ALIAS])
+
+    def test_cached_page_is_rendered_from_primary(self, *mocks):
+        seen = []
+
+        @anonymous_page_cache(lambda request, **kwargs: ["routing-test-pages"])
+        def view(request):
+            seen.append(read_alias())
+            return HttpResponse("ok")
+
+        self.run_view(view)
+        self.assertEqual(seen, [routers.PRIMARY_ALIAS])
+
+
+@override_settings(
+    REPLICA_VIEWS=("story_list",),
+    REPLICA_PIN_SECONDS=10,
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "routing_test_cache"}},
+)
+@mock.patch("core.routers.has_replica", return_value=True)
+@mock.patch("core.middleware.has_replica", return_value=True)
+class DatabaseCacheRoutingTests(TransactionTestCase):
+    """Con CACHE_BACKEND=database, escribir en la caché no fija al primario."""
+
+    # Sin el atomic() de TestCase: dentro de una transacción se lee del primario
+    def setUp(self):
+        call_command("createcachetable", verbosity=0)
+
+    def test_cache_writes_keep_replica_reads(self, *mocks):
+        seen = []
+
+        def view(request):
+            cache.set("routing-test", 1)
+            cache.add("routing-test-add", 1)
+            seen.append(cache.get("routing-test"))
+            seen.append(read_alias())
+            return HttpResponse("ok")
+
+        response = run_view(view)
+        self.assertEqual(seen, [1, routers.REPLICA_ALIAS])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
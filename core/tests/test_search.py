@@ -0,0 +1,53 @@
+from contextlib import nullcontext
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Story
+from core.views import SEARCH_MAX_PAGE, SEARCH_RESULTS_PER_PAGE
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "search-tests"}},
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    },
+)
+class SearchPaginationTests(TestCase):
+    """?pagina= fuera de rango nunca llega al OFFSET de la consulta."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user("autora", password="x")
+        for i in range(SEARCH_RESULTS_PER_PAGE + 3):
+            Story.objects.create(title=f"Dragón {i}", description="-", author=author, status="published")
+
+    def search(self, **params):
+        return self.client.get(reverse("search_combined"), {"q": "dragón", **params})
+
+    def test_huge_page_is_clamped(self):
+        for fallback in (False, True):
+            # Con y sin índice de texto completo (búsqueda por icontains)
+            patch = mock.patch("core.search.search_story_ids", return_value=None) if fallback else nullcontext()
+            with patch, self.subTest(fallback=fallback):
+                response = self.search(pagina="99999999999999999999")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.context["page"], SEARCH_MAX_PAGE)
+                self.assertFalse(response.context["has_next"])
+
+    def test_invalid_page_is_first_page(self):
+        for value in ("abc", "-3", "0"):
+            with self.subTest(pagina=value):
+                self.assertEqual(self.search(pagina=value).context["page"], 1)
+
+    @mock.patch("core.search.search_story_ids", return_value=None)
+    def test_fallback_pages(self, _):
+        first = self.search()
+        self.assertTrue(first.context["has_next"])
+        self.assertEqual(len(first.context["story_results"]), SEARCH_RESULTS_PER_PAGE)
+        second = self.search(pagina=2)
+        self.assertFalse(second.context["has_next"])
+        self.assertEqual(len(second.context["story_results"]), 3)
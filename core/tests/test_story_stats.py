@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from core import story_stats
+from core.models import Comment, Episode, Favorite, Story, StoryStats
+from core.view_counter import apply_view_increments
+
+
+class StoryStatsDeltaTests(TestCase):
+    """Las señales mantienen StoryStats al día sin recalcular agregados."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user("autora", password="x")
+        cls.reader = User.objects.create_user("lectora", password="x")
+
+    def setUp(self):
+        self.story = Story.objects.create(title="Historia", description="-", author=self.author, status="published")
+
+    def stats(self):
+        return StoryStats.objects.get(story=self.story)
+
+    def counters(self):
+        stats = self.stats()
+        return stats.episodes, stats.words, stats.comments
+
+    def add_episode(self, number, content):
+        return Episode.objects.create(story=self.story, number=number, title=f"Ep {number}", content=content)
+
+    def test_new_story_starts_empty(self):
+        self.assertEqual(self.counters(), (0, 0, 0))
+        self.assertEqual(self.stats().last_activity, self.story.created_at)
+
+    def test_episodes_add_and_remove_words(self):
+        first = self.add_episode(1, "una dos tres")
+        self.add_episode(2, "cuatro cinco")
+        self.assertEqual(self.counters(), (2, 5, 0))
+
+        first.content = "una dos tres cuatro cinco seis"
+        first.save()
+        self.assertEqual(self.counters(), (2, 8, 0))
+
+        first.title = "Sin tocar el texto"
+        first.save(update_fields=["title"])
+        self.assertEqual(self.counters(), (2, 8, 0))
+
+        first.delete()
+        self.assertEqual(self.counters(), (1, 2, 0))
+
+    def test_comments_count_and_cascade(self):
+        episode = self.add_episode(1, "texto")
+        comments = [Comment.objects.create(episode=episode, user=self.reader, text=str(i)) for i in range(3)]
+        self.assertEqual(self.counters(), (1, 1, 3))
+        self.assertEqual(self.stats().last_activity, comments[-1].created_at)
+
+        comments[0].delete()
+        self.assertEqual(self.counters(), (1, 1, 2))
+
+        # Borrar el episodio borra sus comentarios en cascada
+        episode.delete()
+        self.assertEqual(self.counters(), (0, 0, 0))
+
+    def test_favorites_and_views_only_mark_activity(self):
+        favorite = Favorite.objects.create(user=self.reader, story=self.story)
+        self.assertEqual(self.stats().last_activity, favorite.created_at)
+
+        before = timezone.now()
+        apply_view_increments({self.story.id: 4})
+        self.assertGreaterEqual(self.stats().last_activity, before)
+        self.assertEqual(self.counters(), (0, 0, 0))
+
+    def test_counters_never_go_negative(self):
+        self.add_episode(1, "una dos")
+        story_stats.apply({"story_id": self.story.id}, episodes=-5, words=-10, comments=-1)
+        self.assertEqual(self.counters(), (0, 0, 0))
+
+    def test_other_stories_are_untouched(self):
+        other = Story.objects.create(title="Otra", description="-", author=self.author)
+        self.add_episode(1, "una dos tres")
+        self.assertEqual(StoryStats.objects.get(story=other).episodes, 0)
+
+    def test_rebuild_matches_incremental_counters(self):
+        episode = self.add_episode(1, "una dos tres")
+        self.add_episode(2, "cuatro")
+        Comment.objects.create(episode=episode, user=self.reader, text="hola")
+        incremental = self.counters()
+
+        StoryStats.objects.filter(story=self.story).update(
+            episodes=99, words=0, comments=7, last_activity=timezone.now() - timedelta(days=30),
+        )
+        self.assertEqual(story_stats.rebuild([self.story.id]), 1)
+        self.assertEqual(self.counters(), incremental)
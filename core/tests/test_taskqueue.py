@@ -0,0 +1,60 @@
+import io
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase
+
+from core import taskqueue
+from core.models import Story, Task
+
+
+class TaskQueueTests(TestCase):
+    """Errores del worker y tareas atómicas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user("autora", password="x")
+        cls.story = Story.objects.create(title="Historia", description="-", author=author, status="published")
+
+    def enqueue_views(self, amount):
+        return taskqueue.enqueue("apply_story_views", {"increments": {str(self.story.id): amount}})
+
+    def views(self):
+        return Story.objects.get(id=self.story.id).views
+
+    def test_failed_status_save_rolls_back_the_views(self):
+        task = self.enqueue_views(3)
+        locked = OperationalError("database is locked")
+
+        with mock.patch.object(Task, "save", side_effect=locked), self.assertRaises(OperationalError):
+            taskqueue.run_task(task.id)
+        self.assertEqual(self.views(), 0)
+
+        # El reintento (tras release_stale) las cuenta una sola vez
+        self.assertTrue(taskqueue.run_task(task.id))
+        self.assertEqual(self.views(), 3)
+        self.assertEqual(Task.objects.get(id=task.id).status, "done")
+
+    def test_task_error_is_retried_without_finished_at(self):
+        task = self.enqueue_views(3)
+        with mock.patch("core.tasks.apply_view_increments", side_effect=ValueError("boom")):
+            self.assertFalse(taskqueue.run_task(task.id))
+
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts, task.finished_at), ("pending", 1, None))
+        self.assertIn("boom", task.last_error)
+        self.assertEqual(self.views(), 0)
+
+    @mock.patch("core.taskqueue.connection")
+    def test_thread_wrapper_logs_instead_of_raising(self, _):
+        with mock.patch("core.taskqueue.run_task", side_effect=OperationalError("database is locked")), \
+                self.assertLogs("core.taskqueue", "ERROR"):
+            self.assertFalse(taskqueue._run_in_thread(1))
+
+    def test_worker_survives_database_errors(self):
+        stderr = io.StringIO()
+        with mock.patch("core.taskqueue.claim", side_effect=OperationalError("database is locked")):
+            call_command("run_worker", "--once", "--threads", "1", stdout=io.StringIO(), stderr=stderr)
+        self.assertIn("database is locked", stderr.getvalue())
@@ -15,6 +15,7 @@ urlpatterns = [
 
     # BUSCADOR
     path("buscar/", views.search_combined, name="search_combined"),
+    path("buscar/autocompletar/", views.search_autocomplete, name="search_autocomplete"),
 
     # PERFIL
     path("perfil/", views.profile_view, name="profile"),
@@ -39,6 +40,8 @@ urlpatterns = [
     path("mi-biblioteca/", views.my_library, name="my_library"),
 
     # COMENTARIOS
+    path("episodio/<int:episode_id>/comentarios/", views.episode_comments, name="episode_comments"),
+    path("episodio/<int:episode_id>/progreso/", views.reading_progress, name="reading_progress"),
     path("comentario/<int:comment_id>/editar/", views.edit_comment, name="edit_comment"),
     path("comentario/<int:comment_id>/eliminar/", views.delete_comment, name="delete_comment"),
 
@@ -58,5 +61,9 @@ urlpatterns = [
     # PERFILES PÚBLICOS + FOLLOW
     path("usuario/<str:username>/", views.public_profile, name="public_profile"),
     path("seguir/<str:username>/", views.toggle_follow, name="toggle_follow"),
+    path("usuario/<str:username>/seguidores/", views.follow_counts, name="follow_counts"),
     path("@<str:username>/", views.public_profile, name="public_profile_short"),
+
+    # MÉTRICAS
+    path("metricas/", views.metrics, name="metrics"),
 ]
@@ -0,0 +1,91 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+from django.utils import timezone
+
+from . import story_stats
+from .buffers import TimedBuffer
+from .models import Story
+from .taskqueue import enqueue
+
+
+# ===========================
+#      CONTADOR DE VISITAS
+# ===========================
+# Las visitas se acumulan en memoria (por proceso) y cada cierto tiempo se
+# encola el lote agregado; el worker lo aplica a Story.views con un único
+# UPDATE ... CASE por bloque de historias. La petición de lectura nunca
+# escribe en la base de datos.
+
+FLUSH_CHUNK_SIZE = 500
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class ViewCounter(TimedBuffer):
+    interval_setting = "STORY_VIEWS_FLUSH_INTERVAL"
+    size_setting = "STORY_VIEWS_FLUSH_SIZE"
+
+    def merge(self, pending, story_id, amount):
+        pending[story_id] = pending.get(story_id, 0) + amount
+
+    def add(self, story_id, amount=1):
+        self.put(story_id, amount)
+
+    def write(self, pending):
+        # El UPDATE lo hace el worker de tareas (core.tasks.apply_story_views)
+        enqueue(
+            "apply_story_views",
+            {"increments": {str(story_id): amount for story_id, amount in pending.items()}},
+        )
+
+
+def apply_view_increments(increments):
+    """Suma {story_id: visitas} a Story.views con un UPDATE ... CASE por bloque."""
+    now = timezone.now()
+    with transaction.atomic():
+        items = sorted(increments.items())
+        for start in range(0, len(items), FLUSH_CHUNK_SIZE):
+            chunk = items[start:start + FLUSH_CHUNK_SIZE]
+            increment = Case(
+                *[When(id=story_id, then=Value(amount)) for story_id, amount in chunk],
+                default=Value(0),
+                output_field=PositiveIntegerField(),
+            )
+            story_ids = [story_id for story_id, _ in chunk]
+            Story.objects.filter(id__in=story_ids).update(views=F("views") + increment)
+            # Última actividad del panel del autor (core.story_stats)
+            story_stats.touch(story_ids, now)
+
+
+view_counter = ViewCounter()
+
+
+def _visitor_id(request):
+    if request.user.is_authenticated:
+        return f"u{request.user.id}"
+    if request.session.session_key:
+        return f"s{request.session.session_key}"
+    raw = f"{request.META.get('REMOTE_ADDR', '')}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return "a" + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def record_view(request, story_id, author_id=None):
+    """
+    Cuenta una visita a la historia, como mucho una por visitante dentro de
+    STORY_VIEWS_DEDUP_WINDOW segundos. El autor no cuenta sus propias visitas.
+    """
+    if request.user.is_authenticated and request.user.id == author_id:
+        return False
+
+    key = f"story_view_seen:{story_id}:{_visitor_id(request)}"
+    if not cache.add(key, 1, timeout=_setting("STORY_VIEWS_DEDUP_WINDOW", 30 * 60)):
+        return False
+
+    view_counter.add(story_id)
+    return True
@@ -1,3 +1,5 @@
+import time
+
 from django.contrib.auth import update_session_auth_hash, login, authenticate, logout
 from django.contrib.auth.forms import PasswordChangeForm, UserCreationForm
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
@@ -5,31 +7,104 @@ from .models import Story, Episode, Category, Comment, Profile, Favorite, Follow
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.utils.encoding import force_bytes
 from django.contrib.auth.models import User
 from django.utils.text import slugify
-from django.core.mail import send_mail
 from django.urls import reverse
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, Http404
+from django.conf import settings
+from django.template.loader import render_to_string
+from .pagination import keyset_paginate
+from .middleware import get_query_stats
+from .comments import load_comments
+from .view_counter import record_view
+from .reading_progress import continue_reading, progress_buffer
+from .page_cache import LISTS_SCOPE, anonymous_page_cache, story_scope
+from . import search
+from . import tasks
+from . import episode_cache
+from . import navigation
+from . import feed
+from . import rankings
+from . import similar
+from . import story_stats
+from .db import retry_on_lock
+from .autocomplete import prefix_index
 from django.contrib.auth.models import User
 from django.contrib.messages import get_messages
+from django.db import transaction
+from django.db.models import F
+
+
+# Ámbitos del caché de páginas anónimas (core.page_cache)
+def lists_page_scopes(request, **kwargs):
+    return [LISTS_SCOPE]
+
+
+def story_page_scopes(request, story_slug, **kwargs):
+    # La ficha también enlaza a las historias vecinas
+    return [LISTS_SCOPE, story_scope(story_slug)]
+
+
+def episode_page_scopes(request, story_slug, **kwargs):
+    return [story_scope(story_slug)]
 
 
+def count_cached_story_view(request, meta):
+    if meta:
+        record_view(request, meta['story_id'], meta['author_id'])
+
+
+FEED_HOME_ITEMS = 10
+HOME_TRENDING_ITEMS = 6
+HOME_POPULAR_ITEMS = 6
+CATEGORY_TRENDING_ITEMS = 3
+SIMILAR_STORIES_ITEMS = 6
+
+
+@anonymous_page_cache(lists_page_scopes)
 def home(request):
-    stories = Story.objects.order_by('-created_at')[:12]
-    return render(request, 'core/home.html', {'stories': stories})
+    stories = story_cards(Story.published.order_by('-created_at', '-id'))[:12]
+    # Top-N precalculado por `manage.py compute_rankings`
+    trending_stories = rankings.trending(story_cards(Story.published), limit=HOME_TRENDING_ITEMS)
+    popular_stories = rankings.popular(story_cards(Story.published), limit=HOME_POPULAR_ITEMS)
+
+    # Nuevos episodios de los autores que sigue el usuario
+    following_feed = []
+    if request.user.is_authenticated:
+        following_feed = feed.get_feed(request.user, limit=FEED_HOME_ITEMS)
+
+    return render(request, 'core/home.html', {
+        'stories': stories,
+        'trending_stories': trending_stories,
+        'popular_stories': popular_stories,
+        'following_feed': following_feed,
+    })
 
 
 from .models import Story, Favorite
 
+
+def check_story_visible(request, story):
+    """Los borradores solo los ve su autor (vista previa)."""
+    if story.status != 'published' and story.author_id != request.user.id:
+        raise Http404
+
+
+@anonymous_page_cache(story_page_scopes, on_hit=count_cached_story_view)
 def story_detail(request, story_slug):
     story = get_object_or_404(Story, slug=story_slug)
+    check_story_visible(request, story)
+    record_view(request, story.id, story.author_id)
+    request.page_cache_meta = {'story_id': story.id, 'author_id': story.author_id}
 
-    episodes = story.episodes.all()
-
-    prev_story = Story.objects.filter(id__lt=story.id).order_by('-id').first()
-    next_story = Story.objects.filter(id__gt=story.id).order_by('id').first()
+    # Índice de navegación en caché: sin consultas para episodios ni vecinas
+    episodes = navigation.story_episodes(story.id)
+    prev_story, next_story = navigation.story_neighbors(story.id)
+    # "A quienes les gustó también les gustó": precalculado fuera de línea
+    similar_stories = similar.similar_stories(story.id, limit=SIMILAR_STORIES_ITEMS)
 
     # Verificar si la historia está marcada como favorita
     is_favorite = False
@@ -41,49 +116,132 @@ def story_detail(request, story_slug):
         'episodes': episodes,
         'prev_story': prev_story,
         'next_story': next_story,
+        'similar_stories': similar_stories,
         'is_favorite': is_favorite,
     }
 
     return render(request, 'core/story_detail.html', context)
 
 
+@anonymous_page_cache(episode_page_scopes)
+@retry_on_lock
 def episode_detail(request, story_slug, number):
-    story = get_object_or_404(Story, slug=story_slug)
-    episode = get_object_or_404(Episode, story=story, number=number)
-    comments = Comment.objects.filter(episode=episode).order_by('-created_at')
-
-    # Buscar episodio anterior
-    prev_episode = Episode.objects.filter(
-        story=story, number__lt=episode.number
-    ).order_by('-number').first()
-
-    # Buscar episodio siguiente
-    next_episode = Episode.objects.filter(
-        story=story, number__gt=episode.number
-    ).order_by('number').first()
+    # Sin las columnas de texto largo: el contenido sale del caché de HTML
+    episode = get_object_or_404(
+        Episode.objects.select_related('story').defer('content', 'story__description'),
+        story__slug=story_slug,
+        number=number,
+    )
+    story = episode.story
+    check_story_visible(request, story)
 
     if request.method == "POST":
-        text = request.POST.get("text")
+        text = request.POST.get("text", "")
         if request.user.is_authenticated and text.strip():
-            Comment.objects.create(
-                user=request.user,
-                episode=episode,
-                text=text.strip()
-            )
+            # Comentario y StoryStats juntos: si algo falla (p. ej. "database
+            # is locked") no queda nada escrito y @retry_on_lock puede repetir
+            with transaction.atomic():
+                Comment.objects.create(
+                    user=request.user,
+                    episode=episode,
+                    text=text.strip()
+                )
             return redirect('episode_detail', story_slug=story_slug, number=number)
 
+    # Episodio anterior / siguiente desde el índice de navegación
+    prev_episode, next_episode = navigation.episode_neighbors(story.id, episode.number)
+
     return render(request, 'core/episode_detail.html', {
         'story': story,
         'episode': episode,
-        'comments': comments,
+        'episode_html': episode_cache.rendered_content(episode),
+        'comments': load_comments(episode),
         'prev_episode': prev_episode,
         'next_episode': next_episode,
+        'toc': navigation.story_episodes(story.id),
     })
 
 
+def episode_comments(request, episode_id):
+    """Páginas siguientes de comentarios (JSON para "Cargar más")."""
+    episode = get_object_or_404(Episode.objects.select_related('story').defer('content'), id=episode_id)
+    check_story_visible(request, episode.story)
+    page = load_comments(episode, cursor=request.GET.get("cursor"))
+
+    html = render_to_string('core/partials/comments.html', {
+        'comments': page,
+    }, request=request)
+    return JsonResponse({'html': html, 'next_cursor': page.next_cursor})
+
+
+def reading_progress(request, episode_id):
+    """
+    Beacon de progreso de lectura (navigator.sendBeacon al salir de la
+    página). No escribe en la BD: lo acumula progress_buffer.
+    """
+    if request.method != "POST" or not request.user.is_authenticated:
+        return HttpResponse(status=204)
+
+    try:
+        percent = max(0, min(100, int(float(request.POST.get("percent", 0)))))
+    except (TypeError, ValueError, OverflowError):  # "nan" / "inf"
+        return HttpResponse(status=400)
+
+    story_id = Episode.objects.filter(id=episode_id).values_list("story_id", flat=True).first()
+    if story_id is None:
+        raise Http404
+
+    progress_buffer.record(request.user.id, story_id, episode_id, percent)
+    return HttpResponse(status=204)
+
+
+# Órdenes disponibles en los listados (?orden=...)
+STORY_ORDERINGS = {
+    'recientes': ('-created_at', '-id'),
+    'populares': ('-favorites_count', '-id'),
+}
+
+STORIES_PER_PAGE = 24
+
+# Solo las columnas que usa una tarjeta de historia (sin la descripción)
+STORY_CARD_FIELDS = (
+    'id', 'title', 'slug', 'cover_image', 'cover_hash', 'cover_width', 'favorites_count', 'created_at',
+    'category__name', 'category__slug',
+)
+
+
+def story_cards(queryset):
+    return queryset.select_related('category').only(*STORY_CARD_FIELDS)
+
+
+def paginated_stories(request, queryset, template, context):
+    """
+    Pagina las tarjetas por cursor. Las peticiones AJAX ("cargar más")
+    reciben solo el fragmento HTML de las tarjetas y el siguiente cursor.
+    """
+    orden = request.GET.get('orden', 'recientes')
+    if orden not in STORY_ORDERINGS:
+        orden = 'recientes'
+
+    page = keyset_paginate(
+        story_cards(queryset),
+        STORY_ORDERINGS[orden],
+        cursor=request.GET.get('cursor'),
+        per_page=STORIES_PER_PAGE,
+    )
+
+    context = {**context, 'stories': page, 'page': page, 'orden': orden}
+
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        html = render_to_string('core/partials/story_cards.html', context, request=request)
+        return JsonResponse({'html': html, 'next_cursor': page.next_cursor})
+
+    return render(request, template, context)
+
+
+@anonymous_page_cache(lists_page_scopes)
 def story_list(request):
-    stories = Story.objects.all().order_by('-created_at')
-    return render(request, 'core/story_list.html', {'stories': stories})
+    return paginated_stories(request, Story.published.all(), 'core/story_list.html', {})
 
 
 def category_list(request):
@@ -91,29 +249,98 @@ def category_list(request):
     return render(request, 'core/category_list.html', {'categories': categories})
 
 
+@anonymous_page_cache(lists_page_scopes)
 def category_detail(request, category_slug):
     category = get_object_or_404(Category, slug=category_slug)
-    stories = Story.objects.filter(category=category).order_by('-created_at')
-    return render(request, 'core/category_detail.html', {
-        'category': category,
-        'stories': stories,
-    })
+
+    # Tendencias de la categoría, solo en la primera página
+    trending_stories = []
+    if not request.GET.get('cursor'):
+        trending_stories = rankings.trending(
+            story_cards(Story.published), category=category, limit=CATEGORY_TRENDING_ITEMS
+        )
+
+    return paginated_stories(
+        request,
+        Story.published.filter(category=category),
+        'core/category_detail.html',
+        {'category': category, 'trending_stories': trending_stories},
+    )
+
+SEARCH_RESULTS_PER_PAGE = 12
+SEARCH_USERS_LIMIT = 20
+# Nadie pasa de aquí buscando por relevancia; además, sin tope un
+# ?pagina= enorme no cabe en el OFFSET de SQLite (OverflowError)
+SEARCH_MAX_PAGE = 100
+
 
 def search_combined(request):
     query = request.GET.get("q", "").strip()
-    stories = Story.objects.filter(title__icontains=query)
-    users = User.objects.filter(username__icontains=query)
+    try:
+        page = min(max(1, int(request.GET.get("pagina", 1))), SEARCH_MAX_PAGE)
+    except ValueError:
+        page = 1
+
+    per_page = SEARCH_RESULTS_PER_PAGE
+    offset = (page - 1) * per_page
+
+    # Índice de texto completo (FTS5 / tsvector), ordenado por relevancia
+    ids = search.search_story_ids(query, limit=per_page + 1, offset=offset)
+    if ids is None:
+        ids = list(
+            Story.published.filter(title__icontains=query)
+            .order_by('-created_at')
+            .values_list('id', flat=True)[offset:offset + per_page + 1]
+        ) if query else []
+
+    has_next = len(ids) > per_page and page < SEARCH_MAX_PAGE
+    ids = ids[:per_page]
+    # El índice solo tiene publicadas, pero una puede haber dejado de estarlo
+    by_id = story_cards(Story.published.filter(id__in=ids)).in_bulk()
+    stories = [by_id[story_id] for story_id in ids if story_id in by_id]
+
+    users = User.objects.none()
+    if query:
+        users = (
+            User.objects.filter(username__istartswith=query)
+            .select_related("profile")
+            .order_by("username")[:SEARCH_USERS_LIMIT]
+        )
+
     return render(request, "core/search_combined.html", {
         "query": query,
         "story_results": stories,
         "user_results": users,
+        "page": page,
+        "has_prev": page > 1,
+        "has_next": has_next,
     })
 
 
+def search_autocomplete(request):
+    """Sugerencias JSON para el buscador del navbar (índice en memoria)."""
+    query = request.GET.get("q", "").strip()
+    prefix_index.ensure_built()
+
+    start = time.perf_counter()
+    matches = prefix_index.search(query)
+    took_ms = (time.perf_counter() - start) * 1000
+
+    results = []
+    for match in matches:
+        if match["type"] == "story":
+            url = reverse("story_detail", args=[match["target"]])
+        else:
+            url = reverse("public_profile", args=[match["target"]])
+        results.append({"type": match["type"], "label": match["label"], "url": url})
+
+    return JsonResponse({"results": results, "took_ms": round(took_ms, 3)})
+
+
 def public_profile(request, username):
     user_obj = get_object_or_404(User, username=username)
     profile = user_obj.profile
-    stories = user_obj.story_set.all()
+    stories = Story.published.filter(author=user_obj)
 
     is_following = False
 
@@ -131,6 +358,7 @@ def public_profile(request, username):
     })
 
 @login_required
+@retry_on_lock
 def toggle_follow(request, username):
     target = get_object_or_404(User, username=username)
 
@@ -138,17 +366,39 @@ def toggle_follow(request, username):
     if target == request.user:
         return redirect("public_profile", username=username)
 
-    follow_obj, created = Follow.objects.get_or_create(
-        follower=request.user,
-        following=target
-    )
+    # Los contadores del perfil se actualizan por señal dentro de esta transacción
+    with transaction.atomic():
+        follow_obj, created = Follow.objects.get_or_create(
+            follower=request.user,
+            following=target
+        )
+
+        if not created:
+            follow_obj.delete()  # dejar de seguir
 
-    if not created:
-        follow_obj.delete()  # dejar de seguir
+    if request.headers.get("x-requested-with") == "XMLHttpRequest":
+        return JsonResponse(follow_counts_data(target, is_following=created))
 
     return redirect("public_profile", username=username)
 
 
+def follow_counts_data(user_obj, is_following=None):
+    counts = Profile.objects.filter(user=user_obj).values("followers_count", "following_count").first() or {}
+    data = {
+        "username": user_obj.username,
+        "followers": counts.get("followers_count", 0),
+        "following": counts.get("following_count", 0),
+    }
+    if is_following is not None:
+        data["is_following"] = is_following
+    return data
+
+
+def follow_counts(request, username):
+    user_obj = get_object_or_404(User, username=username)
+    return JsonResponse(follow_counts_data(user_obj))
+
+
 @login_required
 def profile_view(request):
     profile, created = Profile.objects.get_or_create(user=request.user)
@@ -171,10 +421,16 @@ def edit_profile(request):
         profile.bio = request.POST.get("bio")
 
         # Avatar
-        if "avatar" in request.FILES:
+        new_avatar = "avatar" in request.FILES
+        if new_avatar:
             profile.avatar = request.FILES["avatar"]
 
-        profile.save()
+        # Solo lo editado: los contadores de seguidores cambian con F() en paralelo
+        profile.save(update_fields=["bio", "avatar"] if new_avatar else ["bio"])
+
+        # Miniaturas del avatar nuevo (en segundo plano)
+        if new_avatar:
+            tasks.process_avatar.delay(profile_id=profile.id)
 
         # Redirigir al perfil
         return redirect("profile")
@@ -206,34 +462,46 @@ def create_story_view(request):
         description = request.POST.get("description")
         category_id = request.POST.get("category")
         cover = request.FILES.get("cover")
+        status = request.POST.get("status", "published")
+        if status not in dict(Story.STATUS_CHOICES):
+            status = "published"
 
         if not title or not description:
             return render(request, "core/create_story.html", {
                 "categories": categories,
+                "status_choices": Story.STATUS_CHOICES,
                 "error": "El título y la descripción son obligatorios."
             })
 
         category = Category.objects.get(id=category_id)
         slug = slugify(title)
 
-        story = Story.objects.create(
-            title=title,
-            description=description,
-            category=category,
-            cover_image=cover,
-            slug=slug,
-            author=request.user
-        )
+        # La historia y su fila de StoryStats (señal post_save), juntas
+        with transaction.atomic():
+            story = Story.objects.create(
+                title=title,
+                description=description,
+                category=category,
+                cover_image=cover,
+                slug=slug,
+                status=status,
+                author=request.user
+            )
+
+        # Miniaturas de la portada (en segundo plano)
+        tasks.process_story_cover.delay(story_id=story.id)
 
         return redirect("author_dashboard")
 
     return render(request, "core/create_story.html", {
-        "categories": categories
+        "categories": categories,
+        "status_choices": Story.STATUS_CHOICES,
     })
 
 @login_required
 def author_dashboard(request):
-    stories = Story.objects.filter(author=request.user)
+    # Tarjetas con estadísticas (StoryStats): una sola consulta
+    stories = story_stats.author_stories(request.user)
     return render(request, "core/author_dashboard.html", {
         "stories": stories
     })
@@ -257,12 +525,17 @@ def create_episode_view(request, slug):
             messages.error(request, "Todos los campos son obligatorios.")
             return redirect("create_episode", slug=slug)
 
-        Episode.objects.create(
-            story=story,
-            number=number,
-            title=title,
-            content=content
-        )
+        # Episodio y StoryStats en la misma transacción
+        with transaction.atomic():
+            episode = Episode.objects.create(
+                story=story,
+                number=number,
+                title=title,
+                content=content
+            )
+
+        # Aviso en la timeline de los seguidores (en segundo plano)
+        tasks.fan_out_episode.delay(episode_id=episode.id)
 
         messages.success(request, "Capítulo creado correctamente.")
         return redirect("episode_list", slug=story.slug)
@@ -277,6 +550,7 @@ def create_episode_view(request, slug):
 
 def episode_list_view(request, slug):
     story = get_object_or_404(Story, slug=slug)
+    check_story_visible(request, story)
     episodes = Episode.objects.filter(story=story).order_by("number")
 
     return render(request, "core/episode_list.html", {
@@ -323,19 +597,33 @@ def logout_view(request):
 
 
 @login_required
+@retry_on_lock
 def toggle_favorite(request, story_id):
     story = get_object_or_404(Story, id=story_id)
-    fav, created = Favorite.objects.get_or_create(user=request.user, story=story)
 
-    if not created:
-        fav.delete()
-        is_favorite = False
-    else:
-        is_favorite = True
+    # El favorito y el contador de la historia se actualizan en la misma transacción
+    with transaction.atomic():
+        fav, created = Favorite.objects.get_or_create(user=request.user, story=story)
+
+        if not created:
+            fav.delete()
+            Story.objects.filter(id=story.id, favorites_count__gt=0).update(
+                favorites_count=F("favorites_count") - 1
+            )
+            is_favorite = False
+        else:
+            Story.objects.filter(id=story.id).update(
+                favorites_count=F("favorites_count") + 1
+            )
+            is_favorite = True
 
     # Si es AJAX, devolvemos JSON en vez de redirigir
     if request.headers.get("x-requested-with") == "XMLHttpRequest":
-        return JsonResponse({"favorite": is_favorite})
+        story.refresh_from_db(fields=["favorites_count"])
+        return JsonResponse({
+            "favorite": is_favorite,
+            "favorites_count": story.favorites_count,
+        })
 
     # Si no es AJAX, normal:
     return redirect(request.META.get('HTTP_REFERER', 'home'))
@@ -343,8 +631,15 @@ def toggle_favorite(request, story_id):
 
 @login_required
 def my_library(request):
-    favorites = Favorite.objects.filter(user=request.user).select_related("story")
-    return render(request, "core/my_library.html", {"favorites": favorites})
+    favorites = (
+        Favorite.objects.filter(user=request.user)
+        .select_related("story", "story__category")
+        .order_by("-created_at")
+    )
+    return render(request, "core/my_library.html", {
+        "favorites": favorites,
+        "reading": continue_reading(request.user),
+    })
 
 @login_required
 def edit_comment(request, comment_id):
@@ -401,12 +696,8 @@ def send_verification(request):
         reverse("verify_email", args=[uid, token])
     )
 
-    send_mail(
-        subject="Verifica tu correo | StoryVerse",
-        message=f"Hola, verifica tu correo aquí:\n\n{verify_url}",
-        from_email="no-reply@storyverse.com",
-        recipient_list=[user.email],
-    )
+    # El envío lo hace el worker: la petición no espera al servidor SMTP
+    tasks.send_verification_email.delay(user_id=user.id, verify_url=verify_url)
 
     messages.success(request, "Correo de verificación enviado.")
     return redirect("profile")
@@ -424,7 +715,7 @@ def verify_email(request, uidb64, token):
 
         profile = user.profile
         profile.email_verified = True
-        profile.save()
+        profile.save(update_fields=["email_verified"])
 
         messages.success(request, "¡Tu correo fue verificado exitosamente!")
         return redirect("profile")
@@ -445,17 +736,30 @@ def edit_story(request, story_id):
         if category_id:
             story.category_id = category_id
 
+        # Borrador / publicada
+        status = request.POST.get("status")
+        if status in dict(Story.STATUS_CHOICES):
+            story.status = status
+
         # Guardar nueva portada
-        if "cover_image" in request.FILES:
+        new_cover = "cover_image" in request.FILES
+        if new_cover:
             story.cover_image = request.FILES["cover_image"]
 
-        story.save()
+        # Solo lo editado: visitas y favoritos cambian con F() en paralelo
+        fields = ["title", "description", "category", "status"]
+        story.save(update_fields=fields + ["cover_image"] if new_cover else fields)
+
+        # Miniaturas de la portada nueva (en segundo plano)
+        if new_cover:
+            tasks.process_story_cover.delay(story_id=story.id)
         messages.success(request, "Historia actualizada.")
         return redirect("author_dashboard")
     
     return render(request, "core/edit_story.html", {
         "story": story,
         "categories": categories,   # ← AHORA SÍ
+        "status_choices": Story.STATUS_CHOICES,
     })
 
 
@@ -468,7 +772,7 @@ def delete_story(request, story_id):
 
 @login_required
 def my_stories(request):
-    stories = Story.objects.filter(author=request.user)
+    stories = story_stats.author_stories(request.user)
     return render(request, "core/author_dashboard.html", {
         "stories": stories
     })
@@ -486,7 +790,9 @@ def edit_episode(request, episode_id):
         episode.title = request.POST.get("title")
         episode.number = request.POST.get("number")
         episode.content = request.POST.get("content")
-        episode.save()
+        # Con la diferencia de palabras en StoryStats
+        with transaction.atomic():
+            episode.save()
 
         messages.success(request, "Capítulo actualizado correctamente.")
         return redirect("episode_list", slug=episode.story.slug)
@@ -508,3 +814,24 @@ def delete_episode(request, episode_id):
 
     messages.success(request, "Capítulo eliminado correctamente.")
     return redirect("episode_list", slug=story_slug)
+
+
+@staff_member_required
+def metrics(request):
+    """Métricas SQL acumuladas por vista. Solo staff: incluye el SQL de las consultas."""
+    views = {}
+    for name, data in sorted(get_query_stats().items()):
+        requests = data["requests"]
+        views[name] = {
+            **data,
+            "avg_queries": round(data["queries"] / requests, 2),
+            "avg_sql_ms": round(data["sql_ms"] / requests, 2),
+            "avg_total_ms": round(data["total_ms"] / requests, 2),
+            "budget": settings.QUERY_BUDGETS.get(name),
+        }
+
+    return JsonResponse({
+        "views": views,
+        "autocomplete": prefix_index.stats(),
+        "episode_html_cache": episode_cache.get_stats(),
+    })
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,6 +46,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.QueryInstrumentationMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -80,14 +85,178 @@ WSGI_APPLICATION = 'storyverse.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Configuración por variables de entorno. Sin ninguna, SQLite local.
+#   DB_ENGINE          sqlite3 (por defecto) o postgresql
+#   DB_NAME            fichero SQLite o nombre de la base PostgreSQL
+#   DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+#   DB_CONN_MAX_AGE    segundos que se reutiliza cada conexión
+#   DB_REPLICA_HOST    réplica de lectura (PostgreSQL)
+#   DB_REPLICA_NAME    réplica de lectura (otro fichero SQLite, para probar en local)
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite3')
+
+
+def database(name, host=None):
+    if DB_ENGINE == 'sqlite3':
+        return {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': name,
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+            'OPTIONS': {
+                # Segundos esperando el cerrojo de escritura (busy timeout)
+                'timeout': 20,
+            },
+        }
+    return {
+        'ENGINE': f'django.db.backends.{DB_ENGINE}',
+        'NAME': name,
+        'USER': os.environ.get('DB_USER', ''),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': host or '',
+        'PORT': os.environ.get('DB_PORT', ''),
+        # Conexiones persistentes, comprobadas antes de reutilizarlas
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+    }
+
+
 DATABASES = {
+    'default': database(
+        os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        os.environ.get('DB_HOST'),
+    ),
+}
+
+if os.environ.get('DB_REPLICA_HOST') or os.environ.get('DB_REPLICA_NAME'):
+    DATABASES['replica'] = database(
+        os.environ.get('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        os.environ.get('DB_REPLICA_HOST', DATABASES['default'].get('HOST')),
+    )
+    # En los tests la réplica es la misma base que el primario
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+# Vistas de listado y detalle que leen de la réplica (solo GET)
+REPLICA_VIEWS = (
+    'home', 'story_list', 'story_detail', 'episode_detail', 'episode_comments',
+    'category_list', 'category_detail', 'search_combined', 'search_autocomplete',
+    'public_profile', 'public_profile_short', 'follow_counts',
+)
+
+# Tras escribir, el navegador lee del primario durante estos segundos
+REPLICA_PIN_SECONDS = 10
+
+# PRAGMAs aplicados a cada conexión SQLite nueva (core.db)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,           # ms esperando el cerrojo antes de fallar
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,        # negativo = KiB (64 MB por conexión)
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+
+# Reintentos de las vistas que escriben si SQLite sigue bloqueada
+SQLITE_LOCK_RETRIES = 5
+
+
+# Caché. La invalidación por versiones (core.cache.bump_version: menús,
+# favoritos, páginas anónimas, navegación, autocompletado...) y la
+# deduplicación de visitas solo funcionan si todos los procesos comparten
+# la misma caché. locmem es de cada proceso: SOLO PARA DESARROLLO (un único
+# proceso). En producción, con varios workers de gunicorn, usar Redis o la BD.
+#   CACHE_BACKEND     locmem (por defecto, desarrollo), redis o database
+#   CACHE_LOCATION    redis: URL (redis://localhost:6379/0)
+#                     database: tabla (crearla con `manage.py createcachetable`)
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'storyverse'),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://localhost:6379/0'),
+    'database': ('django.core.cache.backends.db.DatabaseCache', 'storyverse_cache'),
+}
+
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(f"CACHE_BACKEND debe ser uno de: {', '.join(CACHE_BACKENDS)}")
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': os.environ.get('CACHE_LOCATION', CACHE_BACKENDS[CACHE_BACKEND][1]),
     }
 }
 
 
+# Contador de visitas de historias (core.view_counter)
+STORY_VIEWS_DEDUP_WINDOW = 30 * 60     # una visita por visitante cada 30 min
+STORY_VIEWS_FLUSH_INTERVAL = 30        # segundos entre volcados a la BD
+STORY_VIEWS_FLUSH_SIZE = 1000          # o antes, si hay tantas historias pendientes
+
+# Progreso de lectura (ver core/reading_progress.py)
+READING_PROGRESS_FLUSH_INTERVAL = 30   # segundos entre volcados a la BD
+READING_PROGRESS_FLUSH_SIZE = 1000     # o antes, si hay tantos lectores pendientes
+
+
+# Rankings (core.rankings): vida media de la actividad en "tendencias"
+RANKINGS_HALF_LIFE_HOURS = 24
+
+
+# Recomendaciones por favoritos comunes (core.recommendations)
+RECOMMENDATIONS_TOP_K = 10               # vecinas guardadas por historia
+RECOMMENDATIONS_MIN_COMMON = 2           # lectores en común mínimos
+RECOMMENDATIONS_MAX_USER_FAVORITES = 500 # se ignoran usuarios con más favoritos
+
+
+# Índice de autocompletado: aplica los cambios del registro compartido y
+# se reconstruye entero cada 5 min o con más de 500 cambios pendientes
+AUTOCOMPLETE_MAX_AGE = 5 * 60
+AUTOCOMPLETE_MAX_CHANGES = 500
+
+
+# HTML renderizado de los episodios (core.episode_cache)
+EPISODE_HTML_CACHE_TIMEOUT = 7 * 24 * 60 * 60
+
+
+# Páginas completas para visitantes anónimos (core.page_cache)
+PAGE_CACHE_TIMEOUT = 10 * 60
+
+
+# Feed de seguidos (core.feed)
+FEED_MAX_ENTRIES = 500                 # entradas guardadas por usuario
+FEED_FANOUT_MAX_FOLLOWERS = 10000      # más seguidores: fan-out en lectura
+
+
+# Cola de tareas en segundo plano (core.taskqueue, `manage.py run_worker`)
+TASKS_ALWAYS_EAGER = False             # True: ejecutar al momento, sin worker
+TASKS_RETRY_BASE_DELAY = 10            # segundos; se duplica en cada reintento
+TASKS_RETRY_MAX_DELAY = 60 * 60
+TASKS_KEEP_DONE = 24 * 60 * 60         # segundos que se guardan las completadas
+TASKS_KEEP_FAILED = 7 * 24 * 60 * 60   # y las fallidas (para revisar el error)
+
+
+# Presupuesto de consultas SQL por vista (nombre de URL → máximo).
+# Con QUERY_BUDGET_STRICT = True superarlo lanza una excepción (útil en tests);
+# si no, solo se registra un aviso.
+QUERY_BUDGETS = {
+    'home': 11,  # + top de populares (ranking + historias)
+    'story_list': 5,
+    'category_list': 5,
+    'category_detail': 8,
+    'story_detail': 10,
+    'episode_detail': 8,
+    'episode_comments': 5,
+    'public_profile': 10,
+    'episode_list': 7,
+    'my_library': 6,
+    'author_dashboard': 5,
+    'my_stories': 5,
+    'profile': 5,
+}
+
+QUERY_BUDGET_STRICT = False
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 